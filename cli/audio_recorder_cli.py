@@ -34,6 +34,12 @@ def parse_args() -> argparse.Namespace:
     start.add_argument("--compute-type", default="float32")
     start.add_argument("--sessions-dir", default="sessions")
     start.add_argument("--beam-size", type=int, default=5)
+    start.add_argument(
+        "--batch-size",
+        type=int,
+        default=16,
+        help="Windows decoded per GPU forward pass after recording stops (1 disables batching).",
+    )
     start.add_argument(
         "--non-interactive",
         action="store_true",
@@ -99,6 +105,7 @@ def start_command(args: argparse.Namespace) -> int:
         compute_type=args.compute_type,
         sessions_dir=args.sessions_dir,
         beam_size=args.beam_size,
+        batch_size=args.batch_size,
     )
     runner = CLIRunner(cfg)
     runner.start()
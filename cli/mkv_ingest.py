@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import os
 import re
@@ -10,9 +11,18 @@ import sqlite3
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import orjson  # optional dependency
+except ImportError:
+    orjson = None
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
@@ -21,6 +31,14 @@ if str(PROJECT_ROOT) not in sys.path:
 from path_utils import canonicalize_path
 DEFAULT_CONFIG_PATH = PROJECT_ROOT / "mkv_ingest_config.json"
 ISO_FMT = "%Y-%m-%dT%H:%M:%S%z"
+# Seconds between intermediate commits while frames are being ingested
+COMMIT_INTERVAL_S = 2.0
+FRAME_NAME_RE = re.compile(r"frame_(\d+)\.png$")
+UNSAFE_NAME_RE = re.compile(r"[^A-Za-z0-9_-]+")
+# Keep Windows from allocating a console window for every ffmpeg/ffprobe child
+SUBPROCESS_KWARGS: Dict[str, Any] = (
+    {"creationflags": subprocess.CREATE_NO_WINDOW} if os.name == "nt" else {}
+)
 
 
 DEFAULT_CONFIG: Dict[str, Any] = {
@@ -34,16 +52,27 @@ DEFAULT_CONFIG: Dict[str, Any] = {
     "ocr_engine": "tesseract",
     "ocr_language": "eng",
     "ocr_save_line_boxes": False,
+    "ocr_workers": 0,
+    "ocr_cache_enabled": True,
+    "ocr_cache_max_entries": 100000,
     "transcribe_audio": True,
     "whisper_model_size": "medium",
     "whisper_device": "cuda",
-    "whisper_compute_type": "float16",
+    "whisper_compute_type": "auto",
+    "whisper_batch_size": 16,
     "tesseract_path": "",
     "ffmpeg_path": "",
     "ffprobe_path": "",
 }
 
 
+def dumps_json(obj: Any) -> str:
+    # orjson serializes the per-frame OCR payloads several times faster than json
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj)
+
+
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).strftime(ISO_FMT)
 
@@ -77,11 +106,14 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--no-dedup", action="store_true", help="Disable frame deduplication.")
     parser.add_argument("--dedup-threshold", type=float, help="Dedup threshold (default 0.006).")
     parser.add_argument("--save-line-boxes", action="store_true", help="Store line-level OCR boxes.")
+    parser.add_argument("--ocr-workers", type=int, help="Parallel OCR threads (0 = one per core, max 8).")
+    parser.add_argument("--no-ocr-cache", action="store_true", help="Always run OCR; skip the pixel-hash cache.")
     parser.add_argument("--no-transcribe-audio", action="store_true", help="Skip audio transcription.")
     parser.add_argument("--force-transcribe", action="store_true", help="Re-run transcription even if already stored.")
     parser.add_argument("--whisper-model-size", help="Whisper model size (e.g., small, medium, large-v3).")
     parser.add_argument("--whisper-device", help="Whisper device (cuda/cpu).")
-    parser.add_argument("--whisper-compute-type", help="Whisper compute type (float16/int8).")
+    parser.add_argument("--whisper-compute-type", help="Whisper compute type (auto/int8_float16/float16/int8).")
+    parser.add_argument("--whisper-batch-size", type=int, help="Batched Whisper inference size (0/1 = sequential).")
     parser.add_argument("--ffmpeg", help="Override ffmpeg path.")
     parser.add_argument("--ffprobe", help="Override ffprobe path.")
     parser.add_argument("--max-fps", type=float, help="Cap extracted frames per second for faster ingest.")
@@ -105,6 +137,10 @@ def apply_overrides(cfg: Dict[str, Any], args: argparse.Namespace) -> Dict[str,
         cfg["dedup_threshold"] = float(args.dedup_threshold)
     if args.save_line_boxes:
         cfg["ocr_save_line_boxes"] = True
+    if args.ocr_workers is not None:
+        cfg["ocr_workers"] = args.ocr_workers
+    if args.no_ocr_cache:
+        cfg["ocr_cache_enabled"] = False
     if args.no_transcribe_audio:
         cfg["transcribe_audio"] = False
     if args.whisper_model_size:
@@ -113,6 +149,8 @@ def apply_overrides(cfg: Dict[str, Any], args: argparse.Namespace) -> Dict[str,
         cfg["whisper_device"] = args.whisper_device
     if args.whisper_compute_type:
         cfg["whisper_compute_type"] = args.whisper_compute_type
+    if args.whisper_batch_size is not None:
+        cfg["whisper_batch_size"] = args.whisper_batch_size
     if args.ffmpeg:
         cfg["ffmpeg_path"] = args.ffmpeg
     if args.ffprobe:
@@ -121,20 +159,30 @@ def apply_overrides(cfg: Dict[str, Any], args: argparse.Namespace) -> Dict[str,
 
 
 def ensure_db_dir(db_path: Path) -> None:
-    db_path.parent.mkdir(parents=True, exist_ok=True)
+    # One stat in the common case instead of a failing mkdir followed by a stat
+    if not db_path.parent.is_dir():
+        db_path.parent.mkdir(parents=True, exist_ok=True)
 
 
 def open_db(db_path: Path) -> sqlite3.Connection:
-    conn = sqlite3.connect(str(db_path), timeout=60)
+    conn = sqlite3.connect(str(db_path), timeout=60, cached_statements=256)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
     conn.execute("PRAGMA busy_timeout = 60000;")
     conn.execute("PRAGMA journal_mode = WAL;")
     conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute("PRAGMA temp_store = MEMORY;")
     return conn
 
 
+# Bump whenever the DDL in ensure_schema changes so existing databases re-apply it
+SCHEMA_VERSION = 4
+
+
 def ensure_schema(conn: sqlite3.Connection) -> None:
+    # The DDL is idempotent but runs dozens of statements; skip it once this version is recorded
+    if conn.execute("PRAGMA user_version;").fetchone()[0] >= SCHEMA_VERSION:
+        return
     conn.executescript(
         """
         CREATE TABLE IF NOT EXISTS video_chunks (
@@ -205,6 +253,16 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
             FOREIGN KEY (frame_id) REFERENCES frames(id) ON DELETE CASCADE
         );
 
+        -- v3 entries duplicated the full text_json; the cache is disposable, so rebuild it
+        DROP TABLE IF EXISTS ocr_cache;
+        CREATE TABLE IF NOT EXISTS ocr_cache (
+            key TEXT PRIMARY KEY,
+            frame_id INTEGER,
+            text TEXT NOT NULL,
+            boxes_json TEXT NOT NULL,
+            stored_at REAL NOT NULL
+        ) WITHOUT ROWID;
+
         CREATE TABLE IF NOT EXISTS video_metadata (
             video_chunk_id INTEGER PRIMARY KEY,
             fps REAL,
@@ -334,14 +392,17 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
             DELETE FROM ocr_text_fts WHERE frame_id = OLD.frame_id;
         END;
 
+        CREATE INDEX IF NOT EXISTS idx_video_chunks_file_path ON video_chunks(file_path);
         CREATE INDEX IF NOT EXISTS idx_frames_video_chunk_id ON frames(video_chunk_id);
         CREATE INDEX IF NOT EXISTS idx_frames_timestamp ON frames(timestamp);
         CREATE INDEX IF NOT EXISTS idx_frames_timestamp_offset_index ON frames(timestamp, offset_index);
         CREATE INDEX IF NOT EXISTS idx_ocr_text_frame_id ON ocr_text(frame_id);
         CREATE INDEX IF NOT EXISTS idx_ocr_text_length ON ocr_text(text_length);
         CREATE INDEX IF NOT EXISTS idx_ocr_boxes_frame_id ON ocr_boxes(frame_id);
+        CREATE INDEX IF NOT EXISTS idx_ocr_cache_stored_at ON ocr_cache(stored_at);
         """
     )
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION};")
     conn.commit()
 
 
@@ -429,7 +490,7 @@ def ffprobe_metadata(video_path: Path, ffprobe: str) -> Dict[str, Any]:
         "json",
         str(video_path),
     ]
-    proc = subprocess.run(cmd, capture_output=True, text=True)
+    proc = subprocess.run(cmd, capture_output=True, text=True, **SUBPROCESS_KWARGS)
     if proc.returncode != 0:
         raise RuntimeError(f"ffprobe failed: {proc.stderr.strip()}")
     payload = json.loads(proc.stdout or "{}")
@@ -522,7 +583,7 @@ def extract_frames(
     cmd += [
         str(pattern),
     ]
-    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, **SUBPROCESS_KWARGS)
     report_interval = max(1, (total_hint or 0) // 20) if total_hint else 200
     last_reported = 0
     if proc.stdout:
@@ -550,19 +611,26 @@ def extract_frames(
     proc.wait()
     if proc.returncode != 0:
         raise RuntimeError(f"ffmpeg frame extraction failed: {stderr}")
-    frames = sorted(dest_dir.glob("frame_*.png"))
+    # One scandir pass over the extraction dir; names are zero-padded, so a plain string sort is frame order
+    with os.scandir(dest_dir) as it:
+        names = sorted(
+            entry.name for entry in it if entry.name.startswith("frame_") and entry.name.endswith(".png")
+        )
+    frames = [dest_dir / name for name in names]
     if not frames:
         raise RuntimeError("Frame extraction produced no files.")
     return frames
 
 
-def extract_audio(ffmpeg: str, video_path: Path, wav_path: Path) -> None:
+def decode_audio(ffmpeg: str, video_path: Path) -> Any:
+    # Mono 16 kHz PCM straight off ffmpeg's stdout; Whisper takes the array as-is,
+    # so there is no temp WAV to write and decode a second time
+    import numpy as np
     cmd = [
         ffmpeg,
         "-hide_banner",
         "-loglevel",
         "error",
-        "-y",
         "-i",
         str(video_path),
         "-vn",
@@ -571,16 +639,19 @@ def extract_audio(ffmpeg: str, video_path: Path, wav_path: Path) -> None:
         "-ar",
         "16000",
         "-f",
-        "wav",
-        str(wav_path),
+        "s16le",
+        "-",
     ]
-    proc = subprocess.run(cmd, capture_output=True, text=True)
+    proc = subprocess.run(cmd, capture_output=True, **SUBPROCESS_KWARGS)
     if proc.returncode != 0:
-        raise RuntimeError(f"ffmpeg audio extract failed: {proc.stderr.strip()}")
+        raise RuntimeError(f"ffmpeg audio extract failed: {proc.stderr.decode(errors='replace').strip()}")
+    audio = np.frombuffer(proc.stdout, dtype=np.int16).astype(np.float32)
+    audio *= 1.0 / 32768.0
+    return audio
 
 
 def frame_index_from_path(path: Path) -> Optional[int]:
-    match = re.search(r"frame_(\d+)\.png$", path.name)
+    match = FRAME_NAME_RE.search(path.name)
     if not match:
         return None
     return int(match.group(1)) - 1
@@ -588,16 +659,15 @@ def frame_index_from_path(path: Path) -> Optional[int]:
 
 def build_output_dir(base_dir: Path, video_path: Path) -> Path:
     stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_name = re.sub(r"[^A-Za-z0-9_-]+", "_", video_path.stem)
+    safe_name = UNSAFE_NAME_RE.sub("_", video_path.stem)
     return base_dir / f"{safe_name}_{stamp}"
 
 
 def histogram_distance(gray_a: Any, gray_b: Any) -> float:
     import numpy as np
-    hist_a, _ = np.histogram(gray_a.flatten(), bins=256, range=(0, 255))
-    hist_b, _ = np.histogram(gray_b.flatten(), bins=256, range=(0, 255))
-    hist_a = hist_a.astype(np.float64)
-    hist_b = hist_b.astype(np.float64)
+    # 8-bit gray: one bin per level, so a bincount over the flat view matches np.histogram(bins=256)
+    hist_a = np.bincount(gray_a.ravel(), minlength=256).astype(np.float64)
+    hist_b = np.bincount(gray_b.ravel(), minlength=256).astype(np.float64)
     sum_a = hist_a.sum()
     sum_b = hist_b.sum()
     if sum_a == 0 or sum_b == 0:
@@ -619,10 +689,70 @@ def compute_frame_delta(prev_gray: Any, curr_gray: Any) -> float:
     return (hist_diff + ssim_diff) / 2.0
 
 
+# One in-process Tesseract engine per language and OCR thread (tesserocr); an engine is not
+# safe to share across threads. None marks tesserocr as unavailable
+_TESS_LOCAL = threading.local()
+
+
+def tesserocr_api(lang: str) -> Optional[Any]:
+    apis: Dict[str, Any] = getattr(_TESS_LOCAL, "apis", None) or {}
+    _TESS_LOCAL.apis = apis
+    if lang in apis:
+        return apis[lang]
+    # Parallelism comes from the OCR threads; keep each engine single-threaded
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    try:
+        from tesserocr import PyTessBaseAPI
+        api = PyTessBaseAPI(lang=lang)
+    except (ImportError, RuntimeError):
+        api = None
+    apis[lang] = api
+    return api
+
+
+def tesserocr_available(lang: str) -> bool:
+    # Probe with a throwaway engine: OCR runs in the pool threads, which build their own
+    # through tesserocr_api, so nothing should stay cached on the calling thread
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    try:
+        from tesserocr import PyTessBaseAPI
+        api = PyTessBaseAPI(lang=lang)
+    except (ImportError, RuntimeError):
+        return False
+    api.End()
+    return True
+
+
+def tsv_to_dict(tsv: str) -> Dict[str, List[Any]]:
+    # Same shape pytesseract.image_to_data(output_type=Output.DICT) produces
+    header = ["level", "page_num", "block_num", "par_num", "line_num", "word_num",
+              "left", "top", "width", "height", "conf", "text"]
+    data: Dict[str, List[Any]] = {key: [] for key in header}
+    for line in tsv.splitlines():
+        if not line:
+            continue
+        cells = line.split("\t")
+        if len(cells) < len(header):
+            cells.append("")
+        for key, cell in zip(header[:-1], cells):
+            try:
+                data[key].append(int(float(cell)))
+            except ValueError:
+                data[key].append(cell)
+        data["text"].append(cells[len(header) - 1])
+    return data
+
+
 def ocr_tesseract(image: Any, lang: str) -> Tuple[str, str, List[Dict[str, Any]]]:
-    import pytesseract
-    from pytesseract import Output
-    data = pytesseract.image_to_data(image, lang=lang, output_type=Output.DICT)
+    api = tesserocr_api(lang)
+    if api is not None:
+        # Engine and language data stay loaded across frames; no tesseract process per call
+        api.SetImage(image)
+        data = tsv_to_dict(api.GetTSVText(0))
+    else:
+        import pytesseract
+        from pytesseract import Output
+        data = pytesseract.image_to_data(image, lang=lang, output_type=Output.DICT)
     words: List[str] = []
     boxes: List[Dict[str, Any]] = []
     for i, raw_text in enumerate(data.get("text", [])):
@@ -655,7 +785,7 @@ def ocr_tesseract(image: Any, lang: str) -> Tuple[str, str, List[Dict[str, Any]]
                 }
             )
     text = " ".join(words)
-    text_json = json.dumps(
+    text_json = dumps_json(
         {
             "data": data,
             "image": {"width": image.width, "height": image.height},
@@ -697,6 +827,112 @@ def aggregate_line_boxes(word_boxes: List[Dict[str, Any]]) -> List[Dict[str, Any
     return lines
 
 
+def ocr_cache_key(image: Any, lang: str) -> str:
+    # Hash of the decoded pixels plus whatever changes the OCR output; blake3 when installed
+    try:
+        from blake3 import blake3 as hasher
+    except ImportError:
+        hasher = hashlib.blake2b
+    digest = hasher(image.tobytes()).hexdigest()
+    return f"{digest}:{image.mode}:{image.width}x{image.height}:{lang}"
+
+
+def load_cached_ocr(conn: sqlite3.Connection, key: str) -> Optional[Tuple[str, Optional[str], List[Dict[str, Any]]]]:
+    # The raw Tesseract payload is borrowed from the originating frame's ocr_text row while
+    # that frame still exists (frame ids are never reused); otherwise the hit carries none
+    row = conn.execute(
+        """
+        SELECT c.text, c.boxes_json,
+               (SELECT o.text_json FROM ocr_text o WHERE o.frame_id = c.frame_id LIMIT 1) AS text_json
+        FROM ocr_cache c
+        WHERE c.key = ?
+        """,
+        (key,),
+    ).fetchone()
+    if row is None:
+        return None
+    boxes_json = row["boxes_json"]
+    return row["text"], row["text_json"], orjson.loads(boxes_json) if orjson is not None else json.loads(boxes_json)
+
+
+def store_cached_ocr(
+    conn: sqlite3.Connection, key: str, frame_id: int, ocr: Tuple[str, str, List[Dict[str, Any]]]
+) -> None:
+    text, _text_json, boxes = ocr
+    conn.execute(
+        "INSERT OR REPLACE INTO ocr_cache (key, frame_id, text, boxes_json, stored_at) VALUES (?, ?, ?, ?, ?)",
+        (key, frame_id, text, dumps_json(boxes), time.time()),
+    )
+
+
+def prune_ocr_cache(conn: sqlite3.Connection, max_entries: int) -> None:
+    # Keep only the newest max_entries results; a no-op while the cache is under the cap
+    conn.execute(
+        """
+        DELETE FROM ocr_cache
+        WHERE stored_at <= (SELECT stored_at FROM ocr_cache ORDER BY stored_at DESC LIMIT 1 OFFSET ?)
+        """,
+        (max(int(max_entries), 0),),
+    )
+
+
+def insert_ocr_rows(
+    conn: sqlite3.Connection,
+    frame_id: int,
+    ocr: Tuple[str, str, List[Dict[str, Any]]],
+    save_line_boxes: bool,
+) -> None:
+    text, text_json, boxes = ocr
+    if text:
+        conn.execute(
+            """
+            INSERT INTO ocr_text (frame_id, text, text_json, app_name, ocr_engine, window_name, focused, text_length)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                frame_id,
+                text,
+                text_json,
+                "",
+                "tesseract",
+                None,
+                False,
+                len(text),
+            ),
+        )
+
+    if save_line_boxes:
+        boxes.extend(aggregate_line_boxes(boxes))
+
+    if boxes:
+        conn.executemany(
+            """
+            INSERT INTO ocr_boxes (
+                frame_id, level, page_num, block_num, par_num, line_num, word_num,
+                left, top, width, height, conf, text
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    frame_id,
+                    b["level"],
+                    b["page_num"],
+                    b["block_num"],
+                    b["par_num"],
+                    b["line_num"],
+                    b["word_num"],
+                    b["left"],
+                    b["top"],
+                    b["width"],
+                    b["height"],
+                    b["conf"],
+                    b["text"],
+                )
+                for b in boxes
+            ],
+        )
+
+
 def insert_audio_session(
     conn: sqlite3.Connection,
     video_path: Path,
@@ -721,7 +957,6 @@ def insert_audio_session(
             "completed",
         ),
     )
-    conn.commit()
     return int(cur.lastrowid)
 
 
@@ -740,7 +975,6 @@ def upsert_transcription(
         """,
         (canonicalize_path(name), model_size, transcription, utc_now_iso()),
     )
-    conn.commit()
 
 
 def transcription_exists(conn: sqlite3.Connection, video_path: Path, model_size: str) -> bool:
@@ -751,51 +985,97 @@ def transcription_exists(conn: sqlite3.Connection, video_path: Path, model_size:
     return row is not None
 
 
-def transcribe_audio(
-    ffmpeg: str,
-    video_path: Path,
-    cfg: Dict[str, Any],
-    conn: sqlite3.Connection,
-    start_time: datetime,
-    duration: float,
-) -> None:
+def resolve_compute_type(requested: str, device: str) -> str:
+    # "auto": int8 weights with fp16 activations where the GPU supports it (Turing+), about
+    # twice float16's throughput; otherwise the best type CTranslate2 reports for the device
+    if requested != "auto":
+        return requested
+    prefs = ("int8_float16", "float16", "int8_float32", "float32") if device != "cpu" else ("int8", "float32")
+    try:
+        import ctranslate2
+
+        supported = set(ctranslate2.get_supported_compute_types(device))
+    except Exception:
+        supported = set()
+    for cand in prefs:
+        if cand in supported:
+            return cand
+    return prefs[0] if device == "cpu" else "float16"
+
+
+def run_whisper(
+    ffmpeg: str, video_path: Path, cfg: Dict[str, Any], cancel: Optional[threading.Event] = None
+) -> List[str]:
+    # Decode + inference only; no DB access, so it can run off the main thread.
+    # Setting cancel stops it between segments (segments are generated lazily)
     model_size = cfg["whisper_model_size"]
     device = cfg["whisper_device"]
     compute_type = cfg["whisper_compute_type"]
 
-    with tempfile.TemporaryDirectory(prefix="mkv_audio_") as tmpdir:
-        wav_path = Path(tmpdir) / "audio.wav"
-        extract_audio(ffmpeg, video_path, wav_path)
-        try:
-            from faster_whisper import WhisperModel
+    audio = decode_audio(ffmpeg, video_path)
+    if cancel is not None and cancel.is_set():
+        return []
+    try:
+        from faster_whisper import WhisperModel
 
-            model = WhisperModel(model_size, device=device, compute_type=compute_type)
-        except Exception:
-            if device != "cpu":
-                from faster_whisper import WhisperModel
+        model = WhisperModel(model_size, device=device, compute_type=compute_type)
+    except Exception:
+        if device != "cpu":
+            from faster_whisper import WhisperModel
 
-                model = WhisperModel(model_size, device="cpu", compute_type="int8")
-            else:
-                raise
+            model = WhisperModel(model_size, device="cpu", compute_type="int8")
+        else:
+            raise
 
+    try:
+        from faster_whisper import BatchedInferencePipeline
+    except ImportError:  # faster-whisper < 1.1
+        BatchedInferencePipeline = None
+
+    batch_size = int(cfg.get("whisper_batch_size") or 0)
+    if batch_size > 1 and BatchedInferencePipeline is not None:
+        # Decode many VAD-split windows per forward pass instead of one 30 s window at a time
+        segments, _info = BatchedInferencePipeline(model=model).transcribe(
+            audio=audio,
+            batch_size=batch_size,
+            beam_size=5,
+            language="en",
+            word_timestamps=False,
+        )
+    else:
         segments, _info = model.transcribe(
-            audio=str(wav_path),
+            audio=audio,
             beam_size=5,
             language="en",
             word_timestamps=False,
         )
-        lines: List[str] = []
-        for seg in segments:
-            text = (seg.text or "").strip()
-            if not text:
-                continue
-            lines.append(f"[{seg.start:.2f}s -> {seg.end:.2f}s]  {text}")
+    lines: List[str] = []
+    for seg in segments:
+        if cancel is not None and cancel.is_set():
+            break
+        text = (seg.text or "").strip()
+        if not text:
+            continue
+        lines.append(f"[{seg.start:.2f}s -> {seg.end:.2f}s]  {text}")
+    return lines
 
-        if not lines:
-            return
 
-        model_label = f"faster-whisper:{model_size}/{compute_type}"
-        end_time = start_time + timedelta(seconds=duration)
+def save_transcription(
+    conn: sqlite3.Connection,
+    video_path: Path,
+    cfg: Dict[str, Any],
+    lines: List[str],
+    start_time: datetime,
+    duration: float,
+) -> None:
+    if not lines:
+        return
+
+    model_size = cfg["whisper_model_size"]
+    model_label = f"faster-whisper:{model_size}/{cfg['whisper_compute_type']}"
+    end_time = start_time + timedelta(seconds=duration)
+    # Session row and transcript land in one transaction (one commit, one WAL sync)
+    with conn:
         insert_audio_session(conn, video_path, model_label, start_time, end_time)
         upsert_transcription(conn, str(video_path), model_size, "\n".join(lines))
 
@@ -814,7 +1094,7 @@ def main() -> int:
         ) from exc
 
     tesseract_cmd = resolve_tesseract_cmd(str(cfg.get("tesseract_path", "")).strip())
-    if tesseract_cmd:
+    if tesseract_cmd and not tesserocr_available(cfg["ocr_language"]):
         try:
             import pytesseract
 
@@ -892,177 +1172,194 @@ def main() -> int:
     if frame_total_hint is not None and frame_total_hint < 1:
         frame_total_hint = None
 
-    with tempfile.TemporaryDirectory(prefix="mkv_frames_") as tmpdir:
-        frame_dir = Path(tmpdir)
-        print("[mkv_ingest] extracting frames...", flush=True)
-        if frame_total_hint:
-            print(f"[mkv_ingest] extract: 0/{frame_total_hint}", flush=True)
-        frame_paths = extract_frames(
-            ffmpeg,
-            video_path,
-            frame_dir,
-            frame_total_hint,
-            sample_fps,
-            clip_start,
-            clip_end,
-        )
-        frame_total = len(frame_paths)
-        print(f"[mkv_ingest] extracted {frame_total} frames", flush=True)
-
-        dedup_enabled = bool(cfg["dedup_enabled"])
-        dedup_threshold = float(cfg["dedup_threshold"])
-        save_line_boxes = bool(cfg["ocr_save_line_boxes"])
-        frame_format = str(cfg["frame_format"]).lower()
-
-        prev_gray: Optional[np.ndarray] = None
-        kept_frames = 0
-        progress_interval = max(1, frame_total // 20)
-        frame_index_offset = 0
-        if clip_start is not None and clip_start > 0:
-            frame_index_offset = int(clip_start * timestamp_fps)
-
-        conn.execute("BEGIN")
-        print(f"[mkv_ingest] frames: 0/{frame_total} kept=0", flush=True)
-        for idx, frame_path in enumerate(frame_paths, start=1):
-            frame_index = frame_index_from_path(frame_path)
-            if frame_index is None:
-                continue
-            global_index = frame_index + frame_index_offset
-
-            with Image.open(frame_path) as img:
-                img = img.convert("RGB")
-                gray = np.array(img.convert("L"))
-
-                should_keep = True
-                if dedup_enabled and prev_gray is not None:
-                    delta = compute_frame_delta(prev_gray, gray)
-                    if delta < dedup_threshold:
-                        should_keep = False
+    # Whisper (GPU) runs in the background while frames are OCR'd and written; only the
+    # final DB write waits for it
+    whisper_pool: Optional[ThreadPoolExecutor] = None
+    whisper_job: Optional[Future] = None
+    whisper_cancel = threading.Event()
+    if cfg["transcribe_audio"]:
+        model_size = cfg["whisper_model_size"]
+        if not args.force_transcribe and transcription_exists(conn, video_path, model_size):
+            print("[mkv_ingest] transcription already exists, skipping", flush=True)
+        else:
+            cfg["whisper_compute_type"] = resolve_compute_type(
+                str(cfg["whisper_compute_type"]), str(cfg["whisper_device"])
+            )
+            print(
+                f"[mkv_ingest] audio transcription started in background ({cfg['whisper_compute_type']})",
+                flush=True,
+            )
+            whisper_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mkv_whisper")
+            whisper_job = whisper_pool.submit(run_whisper, ffmpeg, video_path, cfg, whisper_cancel)
 
-                if not should_keep:
+    # If the frame stage raises, stop the background transcription instead of letting the
+    # interpreter's exit-time join wait for it to finish on the GPU
+    frames_done = False
+    try:
+        ocr_workers = int(cfg.get("ocr_workers") or 0)
+        if ocr_workers <= 0:
+            ocr_workers = min(8, os.cpu_count() or 1)
+
+        with tempfile.TemporaryDirectory(prefix="mkv_frames_") as tmpdir, ThreadPoolExecutor(
+            max_workers=ocr_workers, thread_name_prefix="mkv_ocr"
+        ) as ocr_pool:
+            frame_dir = Path(tmpdir)
+            print("[mkv_ingest] extracting frames...", flush=True)
+            if frame_total_hint:
+                print(f"[mkv_ingest] extract: 0/{frame_total_hint}", flush=True)
+            frame_paths = extract_frames(
+                ffmpeg,
+                video_path,
+                frame_dir,
+                frame_total_hint,
+                sample_fps,
+                clip_start,
+                clip_end,
+            )
+            frame_total = len(frame_paths)
+            print(f"[mkv_ingest] extracted {frame_total} frames", flush=True)
+
+            dedup_enabled = bool(cfg["dedup_enabled"])
+            dedup_threshold = float(cfg["dedup_threshold"])
+            save_line_boxes = bool(cfg["ocr_save_line_boxes"])
+            frame_format = str(cfg["frame_format"]).lower()
+
+            prev_gray: Optional[np.ndarray] = None
+            kept_frames = 0
+            progress_interval = max(1, frame_total // 20)
+            frame_index_offset = 0
+            if clip_start is not None and clip_start > 0:
+                frame_index_offset = int(clip_start * timestamp_fps)
+
+            # Frames whose OCR is still running, with the cache key to store on a miss;
+            # bounded so decoded images don't pile up
+            pending: Deque[Tuple[int, Optional[str], Future]] = deque()
+            max_pending = ocr_workers * 2
+            ocr_cache_enabled = bool(cfg["ocr_cache_enabled"])
+
+            def finish_ocr() -> None:
+                done_id, key, fut = pending.popleft()
+                ocr = fut.result()
+                if key is not None:
+                    store_cached_ocr(conn, key, done_id, ocr)
+                insert_ocr_rows(conn, done_id, ocr, save_line_boxes)
+
+            conn.execute("BEGIN")
+            last_commit = time.monotonic()
+            print(f"[mkv_ingest] frames: 0/{frame_total} kept=0", flush=True)
+            for idx, frame_path in enumerate(frame_paths, start=1):
+                frame_index = frame_index_from_path(frame_path)
+                if frame_index is None:
                     continue
+                global_index = frame_index + frame_index_offset
+
+                with Image.open(frame_path) as img:
+                    # Decode straight to gray for dedup; the RGB copy is only made for frames that are kept
+                    gray = np.asarray(img.convert("L"))
+
+                    should_keep = True
+                    if dedup_enabled and prev_gray is not None:
+                        delta = compute_frame_delta(prev_gray, gray)
+                        if delta < dedup_threshold:
+                            should_keep = False
+
+                    if not should_keep:
+                        continue
+
+                    prev_gray = gray
+                    kept_frames += 1
+                    img = img.convert("RGB")
+
+                    frame_ts = start_time + timedelta(seconds=global_index / max(timestamp_fps, 1e-6))
+                    stored_path = None
+                    if save_frames and output_dir is not None:
+                        fname = f"frame_{global_index:06d}.{frame_format}"
+                        stored_path = output_dir / fname
+                        if frame_format in {"jpg", "jpeg"}:
+                            img.save(
+                                stored_path,
+                                format="JPEG",
+                                quality=int(cfg["jpeg_quality"]),
+                                optimize=True,
+                            )
+                        else:
+                            img.save(stored_path, format=frame_format.upper())
 
-                prev_gray = gray
-                kept_frames += 1
-
-                frame_ts = start_time + timedelta(seconds=global_index / max(timestamp_fps, 1e-6))
-                stored_path = None
-                if save_frames and output_dir is not None:
-                    fname = f"frame_{global_index:06d}.{frame_format}"
-                    stored_path = output_dir / fname
-                    if frame_format in {"jpg", "jpeg"}:
-                        img.save(
-                            stored_path,
-                            format="JPEG",
-                            quality=int(cfg["jpeg_quality"]),
-                            optimize=True,
-                        )
-                    else:
-                        img.save(stored_path, format=frame_format.upper())
-
-                cur = conn.execute(
-                    """
-                    INSERT INTO frames (video_chunk_id, offset_index, timestamp, name, device_name)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                    (
-                        video_chunk_id,
-                        global_index,
-                        frame_ts.isoformat(),
-                        str(stored_path.resolve()) if stored_path else None,
-                        "",
-                    ),
-                )
-                frame_id = int(cur.lastrowid)
-
-                text, text_json, boxes = ocr_tesseract(img, cfg["ocr_language"])
-                if text:
-                    conn.execute(
+                    cur = conn.execute(
                         """
-                        INSERT INTO ocr_text (frame_id, text, text_json, app_name, ocr_engine, window_name, focused, text_length)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        INSERT INTO frames (video_chunk_id, offset_index, timestamp, name, device_name)
+                        VALUES (?, ?, ?, ?, ?)
                         """,
                         (
-                            frame_id,
-                            text,
-                            text_json,
+                            video_chunk_id,
+                            global_index,
+                            frame_ts.isoformat(),
+                            str(stored_path.resolve()) if stored_path else None,
                             "",
-                            "tesseract",
-                            None,
-                            False,
-                            len(text),
                         ),
                     )
-
-                if save_line_boxes:
-                    boxes.extend(aggregate_line_boxes(boxes))
-
-                if boxes:
-                    conn.executemany(
-                        """
-                        INSERT INTO ocr_boxes (
-                            frame_id, level, page_num, block_num, par_num, line_num, word_num,
-                            left, top, width, height, conf, text
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        [
-                            (
-                                frame_id,
-                                b["level"],
-                                b["page_num"],
-                                b["block_num"],
-                                b["par_num"],
-                                b["line_num"],
-                                b["word_num"],
-                                b["left"],
-                                b["top"],
-                                b["width"],
-                                b["height"],
-                                b["conf"],
-                                b["text"],
-                            )
-                            for b in boxes
-                        ],
-                    )
-
-                if idx % progress_interval == 0 or idx == frame_total:
-                    print(f"[mkv_ingest] frames: {idx}/{frame_total} kept={kept_frames}", flush=True)
-
-                if idx % 25 == 0:
-                    conn.commit()
-                    conn.execute("BEGIN")
-
-        conn.commit()
-        print(f"[mkv_ingest] kept {kept_frames} frames (dedup={'on' if dedup_enabled else 'off'})", flush=True)
-        if not skip_metadata:
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO video_metadata (
-                    video_chunk_id, fps, duration, width, height, frame_count, kept_frames, creation_time, creation_time_source
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    video_chunk_id,
-                    fps,
-                    duration,
-                    width,
-                    height,
-                    len(frame_paths),
-                    kept_frames,
-                    start_time.isoformat(),
-                    creation_source,
-                ),
-            )
+                    frame_id = int(cur.lastrowid)
+
+                    # Identical pixels (re-ingests, overwrite runs) reuse the stored OCR result
+                    cache_key = ocr_cache_key(img, cfg["ocr_language"]) if ocr_cache_enabled else None
+                    cached = load_cached_ocr(conn, cache_key) if cache_key is not None else None
+                    if cached is not None:
+                        fut: Future = Future()
+                        fut.set_result(cached)
+                        pending.append((frame_id, None, fut))
+                    else:
+                        # OCR runs on the pool; rows are written here, in frame order, as results land
+                        pending.append((frame_id, cache_key, ocr_pool.submit(ocr_tesseract, img, cfg["ocr_language"])))
+                    while pending and (len(pending) > max_pending or pending[0][2].done()):
+                        finish_ocr()
+
+                    if idx % progress_interval == 0 or idx == frame_total:
+                        print(f"[mkv_ingest] frames: {idx}/{frame_total} kept={kept_frames}", flush=True)
+
+                    # Commit on a wall-clock cadence so readers see progress without a commit per few frames
+                    if time.monotonic() - last_commit >= COMMIT_INTERVAL_S:
+                        conn.commit()
+                        conn.execute("BEGIN")
+                        last_commit = time.monotonic()
+
+            while pending:
+                finish_ocr()
+            if ocr_cache_enabled:
+                prune_ocr_cache(conn, int(cfg["ocr_cache_max_entries"]))
             conn.commit()
-
-    if cfg["transcribe_audio"]:
-        model_size = cfg["whisper_model_size"]
-        if not args.force_transcribe and transcription_exists(conn, video_path, model_size):
-            print("[mkv_ingest] transcription already exists, skipping", flush=True)
-        else:
-            print("[mkv_ingest] transcribing audio...", flush=True)
-            transcribe_audio(ffmpeg, video_path, cfg, conn, start_time, duration)
-            print("[mkv_ingest] transcription saved", flush=True)
+            print(f"[mkv_ingest] kept {kept_frames} frames (dedup={'on' if dedup_enabled else 'off'})", flush=True)
+            if not skip_metadata:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO video_metadata (
+                        video_chunk_id, fps, duration, width, height, frame_count, kept_frames, creation_time, creation_time_source
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        video_chunk_id,
+                        fps,
+                        duration,
+                        width,
+                        height,
+                        len(frame_paths),
+                        kept_frames,
+                        start_time.isoformat(),
+                        creation_source,
+                    ),
+                )
+                conn.commit()
+        frames_done = True
+    finally:
+        if whisper_pool is not None and not frames_done:
+            whisper_cancel.set()
+            whisper_pool.shutdown(wait=False, cancel_futures=True)
+
+    if whisper_job is not None:
+        print("[mkv_ingest] transcribing audio...", flush=True)
+        lines = whisper_job.result()
+        whisper_pool.shutdown()
+        save_transcription(conn, video_path, cfg, lines, start_time, duration)
+        print("[mkv_ingest] transcription saved", flush=True)
 
     conn.close()
     return 0
@@ -1,13 +1,18 @@
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterator, Optional, Tuple
 
 from path_utils import canonicalize_path
 
 # ISO 8601 format for consistent timestamp formatting across the application
 ISO_FMT = "%Y-%m-%dT%H:%M:%S%z"
 
+# Stored in PRAGMA user_version once init_schema has run; bump whenever the DDL below changes
+SCHEMA_VERSION = 1
+
 
 # Returns the current UTC time as an ISO-formatted string
 # Used for timestamping database records with consistent timezone info
@@ -20,23 +25,42 @@ class TranscriptionDB:
     # Sets up WAL mode for better concurrency and enables foreign key constraints
     def __init__(self, db_path: str = "transcriptions.sqlite3") -> None:
         self.db_path = str(db_path)
-        # Ensure parent directory exists for the database file
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        # Ensure parent directory exists for the database file (skipped for in-memory
+        # databases and when it already exists, the usual case)
+        parent = Path(self.db_path).parent
+        if self.db_path != ":memory:" and not parent.is_dir():
+            parent.mkdir(parents=True, exist_ok=True)
         # Connect to SQLite database (allow multi-threaded access)
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # A larger prepared-statement cache covers every query this long-lived connection issues
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        # The one connection is shared by recorder, transcription and UI threads;
+        # writes and transaction() blocks hold this lock so they never interleave
+        self._lock = threading.RLock()
+        # Nesting depth of transaction() blocks; writes defer their commit while > 0
+        self._tx_depth = 0
         # Enable foreign key constraints for referential integrity
         self.conn.execute("PRAGMA foreign_keys = ON;")
         # Use Write-Ahead Logging for better concurrent read/write performance
         self.conn.execute("PRAGMA journal_mode = WAL;")
         # Use NORMAL synchronous mode for balance between safety and performance
         self.conn.execute("PRAGMA synchronous = NORMAL;")
+        # Wait on a locked database (web server / ingest readers) instead of failing immediately
+        self.conn.execute("PRAGMA busy_timeout = 5000;")
+        # Keep temp b-trees (sorts, FTS merges) in RAM
+        self.conn.execute("PRAGMA temp_store = MEMORY;")
+        # 64 MB page cache and 256 MB memory-mapped reads for the FTS/transcript lookups
+        self.conn.execute("PRAGMA cache_size = -65536;")
+        self.conn.execute("PRAGMA mmap_size = 268435456;")
         # Create tables and indexes if they don't exist
         self.init_schema()
 
     # Creates or updates the database schema with tables, triggers, and FTS indexes
     # Handles migration from legacy schemas if needed
+    # Skipped entirely when the database is already at SCHEMA_VERSION
     def init_schema(self) -> None:
         cur = self.conn.cursor()
+        if cur.execute("PRAGMA user_version;").fetchone()[0] >= SCHEMA_VERSION:
+            return
         # Sessions table stores metadata for each recording session
         # One row per start/stop cycle with device info and model used
         cur.execute(
@@ -56,6 +80,15 @@ class TranscriptionDB:
             """
         )
 
+        # Covers the "latest session for this audio file" lookups (file_path = ? ORDER BY id DESC)
+        # done by the merge tools; id is the rowid, so the index is already ordered by it
+        cur.execute(
+            """
+            CREATE INDEX IF NOT EXISTS ix_audio_sessions_file_path
+            ON audio_sessions(file_path);
+            """
+        )
+
         # Transcriptions table stores normalized text cached by canonical file path
         # Enables deduplicated lookups shared between realtime + batch workflows
         cur.execute(
@@ -75,6 +108,14 @@ class TranscriptionDB:
         # This preserves data when upgrading from older versions
         self._maybe_migrate_transcriptions(cur)
 
+        # Covers the "latest transcript for a file" lookups done by the web server
+        cur.execute(
+            """
+            CREATE INDEX IF NOT EXISTS ix_audio_transcriptions_name_created
+            ON audio_transcriptions(name, created_at DESC);
+            """
+        )
+
         # FTS5 virtual table enables fast full-text search on transcriptions
         # Uses external content table to avoid duplicating data
         cur.execute(
@@ -124,8 +165,33 @@ class TranscriptionDB:
 
         self._rebuild_fts_if_needed(cur)
 
+        # Record the applied version so later opens skip the probes and migration above
+        cur.execute(f"PRAGMA user_version = {SCHEMA_VERSION};")
         self.conn.commit()
 
+    # Groups several writes into a single commit (one WAL fsync instead of one per call)
+    # Rolls back everything written inside the block if it raises; blocks may nest
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._tx_depth += 1
+            try:
+                yield self.conn
+            except BaseException:
+                if self._tx_depth == 1:
+                    self.conn.rollback()
+                raise
+            else:
+                if self._tx_depth == 1:
+                    self.conn.commit()
+            finally:
+                self._tx_depth -= 1
+
+    # Commits unless an enclosing transaction() block will commit for us
+    def _commit(self) -> None:
+        if self._tx_depth == 0:
+            self.conn.commit()
+
     # Creates a new audio recording session in the database
     # Returns the session ID for linking transcriptions later
     # Automatically sets start_time to current UTC timestamp
@@ -139,34 +205,37 @@ class TranscriptionDB:
         channels: Optional[int] = None,
         model: Optional[str] = None,
     ) -> int:
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO audio_sessions (title, file_path, device, sample_rate, channels, model, start_time)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (title, file_path, device, sample_rate, channels, model, utc_now_iso()),
-        )
-        self.conn.commit()
-        return int(cur.lastrowid)
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.execute(
+                """
+                INSERT INTO audio_sessions (title, file_path, device, sample_rate, channels, model, start_time)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (title, file_path, device, sample_rate, channels, model, utc_now_iso()),
+            )
+            self._commit()
+            return int(cur.lastrowid)
 
     # Marks a session as ended with the current timestamp
     # Allows setting custom status (e.g., 'completed', 'cancelled', 'error')
     def end_session(self, session_id: int, *, status: str = 'completed') -> None:
-        self.conn.execute(
-            "UPDATE audio_sessions SET end_time = ?, status = ? WHERE id = ?",
-            (utc_now_iso(), status, session_id),
-        )
-        self.conn.commit()
+        with self._lock:
+            self.conn.execute(
+                "UPDATE audio_sessions SET end_time = ?, status = ? WHERE id = ?",
+                (utc_now_iso(), status, session_id),
+            )
+            self._commit()
 
     # Updates the file path for a session
     # Useful when the file path is determined after session creation
     def set_session_file(self, session_id: int, file_path: str) -> None:
-        self.conn.execute(
-            "UPDATE audio_sessions SET file_path = ? WHERE id = ?",
-            (file_path, session_id),
-        )
-        self.conn.commit()
+        with self._lock:
+            self.conn.execute(
+                "UPDATE audio_sessions SET file_path = ? WHERE id = ?",
+                (file_path, session_id),
+            )
+            self._commit()
 
     # Upserts a transcription record keyed by canonicalized name + model size
     # Automatically triggers the FTS index update via database trigger
@@ -181,33 +250,35 @@ class TranscriptionDB:
     ) -> int:
         if not created_at:
             created_at = utc_now_iso()
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO audio_transcriptions (name, model_size, transcription, created_at)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(name, model_size)
-            DO UPDATE SET
-                transcription = excluded.transcription,
-                created_at = excluded.created_at
-            """,
-            (
-                canonicalize_path(name),
-                model_size,
-                transcription,
-                created_at,
-            ),
-        )
-        self.conn.commit()
-        return int(cur.lastrowid)
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.execute(
+                """
+                INSERT INTO audio_transcriptions (name, model_size, transcription, created_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(name, model_size)
+                DO UPDATE SET
+                    transcription = excluded.transcription,
+                    created_at = excluded.created_at
+                """,
+                (
+                    canonicalize_path(name),
+                    model_size,
+                    transcription,
+                    created_at,
+                ),
+            )
+            self._commit()
+            return int(cur.lastrowid)
 
     # Closes the database connection gracefully
     # Ignores any errors during close (defensive cleanup)
     def close(self) -> None:
-        try:
-            self.conn.close()
-        except Exception:
-            pass
+        with self._lock:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
 
     # --- internal helpers ---
 
@@ -317,14 +388,17 @@ class TranscriptionDB:
                 if existing is None or created_at >= existing[2]:
                     dedup[key] = (row_id, text, created_at)
 
-            for (name, model_size), (row_id, text, created_at) in dedup.items():
-                cur.execute(
-                    """
-                    INSERT INTO audio_transcriptions_new (id, name, model_size, transcription, created_at)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                    (row_id, name, model_size, text, created_at),
-                )
+            # One bulk bind in the sqlite3 C layer instead of a Python-level execute per row
+            cur.executemany(
+                """
+                INSERT INTO audio_transcriptions_new (id, name, model_size, transcription, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [
+                    (row_id, name, model_size, text, created_at)
+                    for (name, model_size), (row_id, text, created_at) in dedup.items()
+                ],
+            )
 
         # Replace table
         cur.execute("DROP TABLE audio_transcriptions")
@@ -7,10 +7,13 @@ manual TSV exports before running the merge.
 
 import argparse
 import json
+import os
 import sqlite3
 import subprocess
 import sys
 import tempfile
+import wave
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -188,7 +191,47 @@ def load_audio_metadata(db_path: Optional[Path], audio_path: Path) -> Optional[A
     return AudioMeta(session_id=row["id"], start=start, end=end)
 
 
+def wav_header_duration(media: Path) -> Optional[float]:
+    # Recorder output is plain PCM WAV; its header already holds the length
+    if media.suffix.lower() != ".wav":
+        return None
+    try:
+        with wave.open(str(media), "rb") as wf:
+            rate = wf.getframerate()
+            frames = wf.getnframes()
+    except (wave.Error, EOFError, OSError):
+        return None
+    if rate <= 0 or frames <= 0:
+        return None
+    return frames / float(rate)
+
+
+def pyav_duration(media: Path) -> Optional[float]:
+    # In-process libav probe (PyAV ships with faster-whisper); None when unavailable or unreadable
+    try:
+        import av
+    except ImportError:
+        return None
+    try:
+        with av.open(str(media)) as container:
+            if container.streams.audio:
+                stream = container.streams.audio[0]
+                if stream.duration is not None and stream.time_base is not None:
+                    return float(stream.duration * stream.time_base)
+            if container.duration is not None:
+                return container.duration / av.time_base
+    except Exception:
+        return None
+    return None
+
+
 def ffprobe_duration(exe: str, media: Path) -> float:
+    # Cheapest source first: WAV header, then libav in-process, then an ffprobe subprocess
+    duration = wav_header_duration(media)
+    if duration is None:
+        duration = pyav_duration(media)
+    if duration is not None:
+        return duration
     cmd = [
         exe,
         "-v",
@@ -257,7 +300,12 @@ def extract_frames(ffmpeg: str, video: Path, dest_dir: Path) -> List[Path]:
     proc = subprocess.run(cmd, capture_output=True, text=True)
     if proc.returncode != 0:
         raise SystemExit(f"ffmpeg frame extraction failed: {proc.stderr.strip()}")
-    frames = sorted(dest_dir.glob("frame_*.png"))
+    # One scandir pass over the extraction dir; names are zero-padded, so a plain string sort is frame order
+    with os.scandir(dest_dir) as it:
+        names = sorted(
+            entry.name for entry in it if entry.name.startswith("frame_") and entry.name.endswith(".png")
+        )
+    frames = [dest_dir / name for name in names]
     if not frames:
         raise SystemExit("Frame extraction produced no files.")
     return frames
@@ -366,8 +414,12 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         raise SystemExit(f"Screenpipe DB not found: {screenpipe_db}")
 
     frame_stamps = load_frames_from_db(screenpipe_db, video_path)
+    audio_meta = load_audio_metadata(args.transcriptions_db, audio_path)
+    ffprobe_exe = args.ffprobe or args.ffmpeg.replace("ffmpeg", "ffprobe")
 
-    with tempfile.TemporaryDirectory(prefix="merge_media_db_") as tmpdir:
+    with tempfile.TemporaryDirectory(prefix="merge_media_db_") as tmpdir, ThreadPoolExecutor(max_workers=1) as pool:
+        # Both steps just wait on a child process, so probe the audio while ffmpeg extracts frames
+        probe = pool.submit(ffprobe_duration, ffprobe_exe, audio_path) if audio_meta is None else None
         frame_dir = Path(tmpdir) / "frames"
         all_frames = extract_frames(args.ffmpeg, video_path, frame_dir)
         frame_map = {idx: path for idx, path in enumerate(all_frames)}
@@ -389,11 +441,8 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         first_ts = frame_stamps[0].timestamp
         last_ts = frame_stamps[-1].timestamp
 
-        audio_meta = load_audio_metadata(args.transcriptions_db, audio_path)
-        ffprobe_exe = args.ffprobe or args.ffmpeg.replace("ffmpeg", "ffprobe")
-
-        if audio_meta is None:
-            duration = ffprobe_duration(ffprobe_exe, audio_path)
+        if probe is not None:
+            duration = probe.result()
             audio_start = first_ts
             audio_end = first_ts + timedelta(seconds=duration)
             audio_meta = AudioMeta(session_id=None, start=audio_start, end=audio_end)
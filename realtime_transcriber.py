@@ -1,10 +1,15 @@
+import concurrent.futures
+import concurrent.futures.process
+import math
+import os
+import sys
 import threading
 import queue
 import wave
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Callable
+from typing import TYPE_CHECKING, Optional, Callable, Dict, Tuple
 
 import numpy as np
 import logging
@@ -14,7 +19,8 @@ try:
 except Exception as e:  # pragma: no cover
     sd = None
 
-from faster_whisper import WhisperModel
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
 
 from db import TranscriptionDB
 
@@ -23,6 +29,11 @@ try:
 except Exception:
     webrtcvad = None  # Optional dependency
 
+try:
+    from scipy.signal import resample_poly  # type: ignore
+except Exception:
+    resample_poly = None  # Optional dependency; linear interpolation fallback
+
 # Simple console logger
 logger = logging.getLogger("realtime_transcriber")
 if not logger.handlers:
@@ -38,9 +49,10 @@ class TranscriberConfig:
     device: str = "cuda"
     language: str = "en"
     compute_type: str = "float32"  # e.g., "float16", "float32", "int8_float16"
-    sample_rate: int = 16000
+    sample_rate: int = 16000  # capture rate; use the device-native rate to skip PortAudio resampling
     channels: int = 1
-    beam_size: int = 5
+    beam_size: int = 1  # greedy for streaming flushes; decoder cost scales with beam width
+    final_beam_size: int = 5  # wider beam for the last flush after stop()
     vad_filter: bool = True
     overlap_seconds: float = 0.3  # small tail to avoid boundary cuts
     # Silence-driven flushing (no arbitrary time slicing)
@@ -53,9 +65,65 @@ class TranscriberConfig:
     max_buffer_seconds: float = 10.0  # safety cap to avoid long-latency backlogs
     condition_on_previous_text: bool = False,
     sessions_dir: str = "sessions"
+    # Decoder scheduling: CPU threads for CTranslate2 and optional CPU pinning of the transcribe thread
+    cpu_threads: int = max(1, (os.cpu_count() or 2) // 2)
+    transcribe_cpus: Optional[Tuple[int, ...]] = None  # e.g. (0, 1); Linux only
+
+
+# Loaded models shared by every RealtimeTranscriber. Each instance calls transcribe()
+# serially from its own thread, so sharing avoids reloading weights per construction.
+_MODEL_CACHE: Dict[Tuple[str, str, str, int], "WhisperModel"] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
+
+def _load_model(cfg: "TranscriberConfig") -> "WhisperModel":
+    # Deferred import: faster_whisper pulls in ctranslate2/CUDA, only needed once a model loads
+    from faster_whisper import WhisperModel
+
+    key = (cfg.model_size, cfg.device, cfg.compute_type, cfg.cpu_threads)
+    with _MODEL_CACHE_LOCK:
+        model = _MODEL_CACHE.get(key)
+        if model is not None:
+            return model
+        try:
+            model = WhisperModel(
+                cfg.model_size,
+                device=cfg.device,
+                compute_type=cfg.compute_type,
+                cpu_threads=cfg.cpu_threads,
+                num_workers=1,
+            )
+        except Exception:
+            if cfg.device != "cpu":
+                # Fallback to CPU to remain usable out-of-the-box
+                model = WhisperModel(
+                    cfg.model_size,
+                    device="cpu",
+                    compute_type="int8",  # lighter CPU default
+                    cpu_threads=cfg.cpu_threads,
+                    num_workers=1,
+                )
+            else:
+                raise
+        _MODEL_CACHE[key] = model
+        return model
+
+
+# PortAudio block size (~32ms @16kHz) and depth of the capture queue
+_BLOCK_SIZE = 512
+_AUDIO_Q_MAX = 256
+# Whisper always decodes 16 kHz mono
+_WHISPER_SR = 16000
+# Accumulate PCM and hit the WAV file in ~64 KiB writes (~2 s @16kHz mono int16)
+_WAV_FLUSH_BYTES = 64 * 1024
 
 
 class RealtimeTranscriber:
+    # Speech-only post-processing is CPU-bound; run it in a separate interpreter so it
+    # neither fights the GIL nor stalls a follow-up recording. Created lazily, shared.
+    _post_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+    _post_pool_lock = threading.Lock()
+
     def __init__(
         self,
         db_path: str = "transcriptions.sqlite3",
@@ -66,6 +134,10 @@ class RealtimeTranscriber:
     ) -> None:
         if config is None:
             config = TranscriberConfig()
+        # PortAudio delivers mono directly; no Python-side mixdown. Non-16 kHz capture is
+        # resampled once per flush right before decoding (see _to_whisper_rate).
+        if config.channels != 1:
+            raise ValueError(f"RealtimeTranscriber captures mono audio (got channels={config.channels})")
         self.cfg = config
         self.on_segment = on_segment
         self.on_error = on_error
@@ -75,35 +147,28 @@ class RealtimeTranscriber:
         # a speech-only audio and silence map next to the recorded WAV.
         self.on_complete = on_complete or self._default_on_complete
 
-        # Model (with simple CPU fallback if CUDA not available)
-        try:
-            self.model = WhisperModel(
-                self.cfg.model_size,
-                device=self.cfg.device,
-                compute_type=self.cfg.compute_type,
-            )
-        except Exception:
-            if self.cfg.device != "cpu":
-                # Fallback to CPU to remain usable out-of-the-box
-                self.model = WhisperModel(
-                    self.cfg.model_size,
-                    device="cpu",
-                    compute_type="int8",  # lighter CPU default
-                )
-            else:
-                raise
+        # Model (shared across instances; simple CPU fallback if CUDA not available)
+        self.model = _load_model(self.cfg)
 
         # DB
         self.db = TranscriptionDB(db_path)
         self.session_id: Optional[int] = None
 
         # Runtime state
-        self._audio_q: "queue.Queue[np.ndarray]" = queue.Queue(maxsize=256)
+        self._audio_q: "queue.Queue[np.ndarray]" = queue.Queue(maxsize=_AUDIO_Q_MAX)
+        # Preallocated capture blocks reused round-robin by the audio callback. One slot
+        # more than the queue can hold (plus the one being consumed) so a queued block
+        # is never overwritten before the transcription thread copies it out.
+        self._block_ring = [
+            np.empty((_BLOCK_SIZE, self.cfg.channels), dtype=np.float32) for _ in range(_AUDIO_Q_MAX + 2)
+        ]
+        self._ring_idx = 0
         self._stop_event = threading.Event()
         self._paused_event = threading.Event()
         self._transcribe_thread: Optional[threading.Thread] = None
         self._stream: Optional[sd.InputStream] = None if sd else None
         self._wav: Optional[wave.Wave_write] = None
+        self._wav_buf = bytearray()
         self._wav_path: Optional[Path] = None
         # Optional WebRTC VAD
         self._webrtc_vad = None
@@ -146,6 +211,7 @@ class RealtimeTranscriber:
         self._wav.setnchannels(self.cfg.channels)
         self._wav.setsampwidth(2)  # 16-bit PCM
         self._wav.setframerate(self.cfg.sample_rate)
+        self._wav_buf.clear()
 
         # Start microphone stream
         self._stop_event.clear()
@@ -155,7 +221,7 @@ class RealtimeTranscriber:
             channels=self.cfg.channels,
             dtype="float32",
             callback=self._audio_callback,
-            blocksize=512,  # smaller block for faster pause detection (~32ms @16kHz)
+            blocksize=_BLOCK_SIZE,  # smaller block for faster pause detection (~32ms @16kHz)
         )
         self._stream.start()
 
@@ -197,12 +263,7 @@ class RealtimeTranscriber:
             self._transcribe_thread.join(timeout=30)
             self._transcribe_thread = None
 
-        if self._wav:
-            try:
-                self._wav.close()
-            except Exception:
-                pass
-            self._wav = None
+        self._close_wav()
 
         if self.session_id is not None:
             self.db.end_session(self.session_id, status="completed")
@@ -213,10 +274,13 @@ class RealtimeTranscriber:
         wav_path_str = str(self._wav_path) if self._wav_path is not None else None
         if self.on_complete and wav_path_str:
             try:
-                threading.Thread(target=self._run_on_complete, args=(wav_path_str,), daemon=True).start()
+                if self.on_complete == self._default_on_complete:
+                    self._submit_default_on_complete(wav_path_str)
+                else:
+                    threading.Thread(target=self._run_on_complete, args=(wav_path_str,), daemon=True).start()
             except Exception:
-                # Avoid raising from stop()
-                pass
+                # Avoid raising from stop(), but don't lose post-processing failures silently
+                logger.exception("Failed to start post-processing for %s", wav_path_str)
 
     def pause(self) -> None:
         """Pause audio capture/transcription without ending the session."""
@@ -237,20 +301,71 @@ class RealtimeTranscriber:
         if self._stop_event.is_set() or self._paused_event.is_set():
             return
 
-        # Queue a copy for transcription
+        # Queue a copy for transcription (into a reused ring slot; no per-callback malloc)
+        if frames <= _BLOCK_SIZE:
+            dst = self._block_ring[self._ring_idx % len(self._block_ring)][:frames]
+            np.copyto(dst, indata)
+        else:
+            dst = indata.copy()
         try:
-            self._audio_q.put_nowait(indata.copy())
+            self._audio_q.put_nowait(dst)
+            self._ring_idx += 1
         except queue.Full:
             # If the queue is full, drop the chunk to avoid blocking the audio thread
             pass
 
-        # Write to WAV as 16-bit PCM
+        # Write to WAV as 16-bit PCM, batched into ~64 KiB writes
         if self._wav is not None and not self._paused_event.is_set():
             pcm16 = np.clip(indata, -1.0, 1.0)
             pcm16 = (pcm16 * 32767.0).astype(np.int16)
-            self._wav.writeframes(pcm16.tobytes())
+            self._wav_buf.extend(memoryview(pcm16).cast("B"))
+            if len(self._wav_buf) >= _WAV_FLUSH_BYTES:
+                self._flush_wav_buf()
+
+    def _flush_wav_buf(self) -> None:
+        if self._wav is not None and self._wav_buf:
+            self._wav.writeframes(self._wav_buf)
+        self._wav_buf.clear()
+
+    def _close_wav(self) -> None:
+        if self._wav is not None:
+            try:
+                self._flush_wav_buf()
+                self._wav.close()
+            except Exception:
+                pass
+        self._wav = None
+
+    def _prioritize_transcribe_thread(self) -> None:
+        # Best-effort: steadier decoder scheduling means fewer late silence flushes
+        try:
+            if self.cfg.transcribe_cpus and hasattr(os, "sched_setaffinity"):
+                # pid 0 targets the calling thread on Linux
+                os.sched_setaffinity(0, set(self.cfg.transcribe_cpus))
+            if sys.platform == "win32":
+                import ctypes
+
+                kernel32 = ctypes.windll.kernel32  # type: ignore[attr-defined]
+                THREAD_PRIORITY_ABOVE_NORMAL = 1
+                kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_PRIORITY_ABOVE_NORMAL)
+        except Exception:
+            logger.debug("Could not adjust transcription thread scheduling", exc_info=True)
+
+    @staticmethod
+    def _to_whisper_rate(audio: np.ndarray, sr: int) -> np.ndarray:
+        # One polyphase FIR over the whole flush instead of per-frame resampling
+        if sr == _WHISPER_SR or audio.size == 0:
+            return audio
+        if resample_poly is not None:
+            g = math.gcd(_WHISPER_SR, sr)
+            return resample_poly(audio, _WHISPER_SR // g, sr // g).astype(np.float32, copy=False)
+        n_out = int(round(audio.size * _WHISPER_SR / sr))
+        src_t = np.arange(audio.size, dtype=np.float64) / sr
+        dst_t = np.arange(n_out, dtype=np.float64) / _WHISPER_SR
+        return np.interp(dst_t, src_t, audio).astype(np.float32)
 
     def _run_transcription(self) -> None:
+        self._prioritize_transcribe_thread()
         # Chunked processing from an in-memory buffer (no generator into ffmpeg)
         sr = self.cfg.sample_rate
         overlap_samples = int(self.cfg.overlap_seconds * sr)
@@ -283,8 +398,7 @@ class RealtimeTranscriber:
                         self._stop_event.set()
                         break
                     drained = True
-                    if chunk.ndim == 2 and chunk.shape[1] > 1:
-                        chunk = np.mean(chunk, axis=1, keepdims=True)
+                    # Stream is opened mono, so (frames, 1) flattens without a mixdown
                     chunk = chunk.reshape(-1)
                     audio_buf = np.concatenate([audio_buf, chunk])
                     # Update VAD state using WebRTC when available, otherwise energy-based fallback
@@ -316,26 +430,25 @@ class RealtimeTranscriber:
                                 # Not enough to form a frame yet, keep in remainder
                                 self._vad_remainder = proc
                         else:
-                            # Energy fallback
-                            abs_chunk = np.abs(chunk)
+                            # Energy fallback: one compare pass to find the last loud sample,
+                            # then a single dot product (sum of squares) for the RMS update
                             thr = max(self.cfg.vad_energy_threshold, noise_floor * 1.8)
-                            speech_mask = abs_chunk >= thr
+                            speech_idx = np.flatnonzero(np.abs(chunk) >= thr)
                             dur = chunk.size / sr
-                            if speech_mask.any():
-                                last_idx = int(np.flatnonzero(speech_mask)[-1])
+                            if speech_idx.size:
+                                last_idx = int(speech_idx[-1])
                                 trailing_samples = chunk.size - last_idx - 1
                                 trailing_silence_sec = trailing_samples / sr
                                 had_speech_since_flush = True
                                 # Update noise floor from the trailing silent tail if present
                                 if trailing_samples > 0:
                                     tail = chunk[last_idx + 1 :]
-                                    if tail.size:
-                                        tail_rms = float(np.sqrt(np.mean(np.square(tail), dtype=np.float64)))
-                                        noise_floor = 0.98 * noise_floor + 0.02 * max(tail_rms, 1e-7)
+                                    tail_rms = math.sqrt(float(np.dot(tail, tail)) / tail.size)
+                                    noise_floor = 0.98 * noise_floor + 0.02 * max(tail_rms, 1e-7)
                             else:
                                 # Entire chunk is silence
                                 trailing_silence_sec += dur
-                                rms = float(np.sqrt(np.mean(np.square(chunk), dtype=np.float64)))
+                                rms = math.sqrt(float(np.dot(chunk, chunk)) / chunk.size)
                                 noise_floor = 0.98 * noise_floor + 0.02 * max(rms, 1e-7)
 
                     # If we have enough trailing silence or user paused, flush immediately
@@ -370,10 +483,14 @@ class RealtimeTranscriber:
                     trailing_silence_sec = 0.0
                     had_speech_since_flush = False
                     continue
+                beam = self.cfg.final_beam_size if self._stop_event.is_set() else self.cfg.beam_size
+                # WebRTC VAD already delimited speech and trimmed the silent tail;
+                # keep Silero (inside faster-whisper) only as the fallback path
+                webrtc_trimmed = use_webrtc and (trim_tail > 0 or had_speech_since_flush)
                 segments, info = self.model.transcribe(
-                    audio=to_process,
-                    beam_size=self.cfg.beam_size,
-                    vad_filter=self.cfg.vad_filter,
+                    audio=self._to_whisper_rate(to_process, sr),
+                    beam_size=beam,
+                    vad_filter=self.cfg.vad_filter and not webrtc_trimmed,
                     vad_parameters={"min_silence_duration_ms": int(self.cfg.vad_silence_seconds * 1000), "speech_pad_ms": 80},
                     condition_on_previous_text=True,
                     word_timestamps=False,
@@ -449,12 +566,7 @@ class RealtimeTranscriber:
                 # Avoid masking the original error/cleanup
                 pass
             # Ensure WAV closed if stop happened during decoding
-            if self._wav is not None:
-                try:
-                    self._wav.close()
-                except Exception:
-                    pass
-            self._wav = None
+            self._close_wav()
 
     def _run_on_complete(self, wav_path: str) -> None:
         try:
@@ -465,20 +577,68 @@ class RealtimeTranscriber:
             # Swallow exceptions from user callback to keep shutdown robust
             pass
 
+    @classmethod
+    def _submit_post(cls, fn, *args) -> Tuple["concurrent.futures.Future", concurrent.futures.ProcessPoolExecutor]:
+        # Submits to the shared post-processing pool. A crashed worker (OOM kill, native
+        # fault) breaks the whole executor, so replace it once instead of failing forever.
+        with cls._post_pool_lock:
+            if cls._post_pool is None:
+                cls._post_pool = concurrent.futures.ProcessPoolExecutor(max_workers=1)
+            pool = cls._post_pool
+            try:
+                return pool.submit(fn, *args), pool
+            except concurrent.futures.process.BrokenProcessPool:
+                logger.warning("Post-processing pool was broken; starting a new one")
+                cls._reset_post_pool(pool)
+                pool = cls._post_pool = concurrent.futures.ProcessPoolExecutor(max_workers=1)
+                return pool.submit(fn, *args), pool
+
+    @classmethod
+    def _reset_post_pool(cls, pool: Optional[concurrent.futures.ProcessPoolExecutor]) -> None:
+        # Drops the given pool if it is still the shared one; callers must hold _post_pool_lock
+        if cls._post_pool is pool and pool is not None:
+            cls._post_pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit_default_on_complete(self, wav_path: str) -> None:
+        # Lazy import to avoid coupling unless used
+        from speech_silence import build_speech_only_with_silence_map, derive_outputs
+
+        out_audio, out_map = derive_outputs(wav_path)
+        logger.info("Starting speech-only conversion for %s", wav_path)
+        future, pool = self._submit_post(build_speech_only_with_silence_map, wav_path, out_audio, out_map)
+
+        def _done(fut: "concurrent.futures.Future") -> None:
+            try:
+                self._log_conversion(fut.result())
+            except concurrent.futures.process.BrokenProcessPool as e:
+                logger.exception("Post-processing worker died for %s: %s", wav_path, e)
+                # Make the next session start a fresh pool instead of hitting the broken one
+                with type(self)._post_pool_lock:
+                    type(self)._reset_post_pool(pool)
+            except Exception as e:
+                logger.exception("Post-processing failed for %s: %s", wav_path, e)
+
+        future.add_done_callback(_done)
+
+    @staticmethod
+    def _log_conversion(res) -> None:
+        logger.info(
+            "Conversion complete. Audio=%s Map=%s Speech=%.2fs Removed=%.2fs Segments=%d",
+            res.output_audio_path,
+            res.silence_map_path,
+            res.speech_ms / 1000.0,
+            res.removed_ms / 1000.0,
+            res.segment_count,
+        )
+
     def _default_on_complete(self, wav_path: str) -> None:
+        # Synchronous variant; stop() routes the default through _submit_default_on_complete
         try:
             # Lazy import to avoid coupling unless used
             from speech_silence import build_speech_only_with_silence_map, derive_outputs
 
             out_audio, out_map = derive_outputs(wav_path)
-            res = build_speech_only_with_silence_map(wav_path, out_audio, out_map)
-            logger.info(
-                "Conversion complete. Audio=%s Map=%s Speech=%.2fs Removed=%.2fs Segments=%d",
-                res.output_audio_path,
-                res.silence_map_path,
-                res.speech_ms / 1000.0,
-                res.removed_ms / 1000.0,
-                res.segment_count,
-            )
+            self._log_conversion(build_speech_only_with_silence_map(wav_path, out_audio, out_map))
         except Exception as e:
             logger.exception("Post-processing failed for %s: %s", wav_path, e)
@@ -1,22 +1,43 @@
 from __future__ import annotations
 
+import io
+import json
 import os
+import queue
 import re
 import sqlite3
 import string
+import struct
+import time
+import warnings
 import wave
+import zlib
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from urllib.parse import quote
 
+import numpy as np
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+import anyio.to_thread
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, PlainTextResponse, FileResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, FileResponse, Response
 from starlette.staticfiles import StaticFiles
 
 from path_utils import canonicalize_path
 
 # Root directory of the application - used for resolving relative paths
 ROOT = Path(__file__).parent.resolve()
+# String prefix of ROOT used when building /files URLs
+_ROOT_PREFIX = str(ROOT) + os.sep
+_IS_WIN = os.sep != "/"
 # Additional directories that are safe to serve over /files_abs
 def _extra_allowed_roots() -> List[Path]:
     roots: List[Path] = []
@@ -38,20 +59,56 @@ ALLOWED_FILE_ROOTS = [
     (Path.home() / ".screenpipe").resolve(),
     *_extra_allowed_roots(),
 ]
+# Canonical forms of the allowed roots, compared as plain strings in _resolve_allowed_file
+_ALLOWED_ROOTS = frozenset(os.path.normcase(os.path.realpath(str(b))) for b in ALLOWED_FILE_ROOTS)
+_ALLOWED_PREFIXES = tuple(r if r.endswith(os.sep) else r + os.sep for r in _ALLOWED_ROOTS)
 # Path to the SQLite database containing transcriptions
 DB_PATH = ROOT / "transcriptions.sqlite3"
 
 
-# Opens a connection to the transcriptions database
+# Maximum number of idle connections kept open between requests
+POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+# Idle connections; reusing them keeps SQLite's per-connection page cache warm
+_POOL: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=POOL_SIZE)
+
+
+# Opens a new connection to the transcriptions database
 # Returns connection with Row factory for dict-like access to columns
-def _db() -> sqlite3.Connection:
+def _connect() -> sqlite3.Connection:
     if not DB_PATH.exists():
         raise FileNotFoundError(f"SQLite not found: {DB_PATH}")
-    conn = sqlite3.connect(str(DB_PATH))
+    # Pooled connections live for the whole process, so keep every route's statements prepared
+    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, cached_statements=256)
     conn.row_factory = sqlite3.Row
+    # WAL lets readers proceed while the recorder writes; NORMAL drops the per-commit fsync
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute("PRAGMA busy_timeout = 30000;")
+    conn.execute("PRAGMA mmap_size = 268435456;")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute("PRAGMA cache_size = -64000;")
     return conn
 
 
+# Borrows a pooled connection for the duration of a request
+# Connections are opened lazily and returned to the pool afterwards
+@contextmanager
+def _db() -> Iterator[sqlite3.Connection]:
+    try:
+        conn = _POOL.get_nowait()
+    except queue.Empty:
+        conn = _connect()
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            _POOL.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
 # Normalizes file paths from database to OS-specific absolute paths
 # Handles backslash-to-forward-slash conversion and resolves relative paths
 def _norm_path(p: str) -> Path:
@@ -63,95 +120,150 @@ def _norm_path(p: str) -> Path:
 
 
 def _resolve_allowed_file(raw: str) -> Path:
-    candidate = Path(raw.replace("\\", "/"))
-    if not candidate.is_absolute():
-        candidate = ROOT / candidate
-    candidate = candidate.resolve()
-    for base in ALLOWED_FILE_ROOTS:
-        base_resolved = base.resolve(strict=False)
-        try:
-            candidate.relative_to(base_resolved)
-            return candidate
-        except ValueError:
-            continue
+    candidate = raw.replace("\\", "/")
+    if not os.path.isabs(candidate):
+        candidate = os.path.join(str(ROOT), candidate)
+    # One realpath, then a string-prefix test against the precomputed roots
+    real = os.path.realpath(candidate)
+    key = os.path.normcase(real)
+    if key in _ALLOWED_ROOTS or key.startswith(_ALLOWED_PREFIXES):
+        return Path(real)
     raise HTTPException(status_code=403, detail="File path outside of allowed directories")
 
 
 # Generates expected file paths for speech-only audio and silence map
 # Given original WAV, returns paths for derivative files created by post-processing
 # Example: session.wav -> session-silenced.wav, session-silence_map.tsv
-def _related_speech_paths(wav: Path) -> Tuple[Path, Path]:
-    base = wav.with_suffix("")
-    speech_audio = base.with_name(f"{base.name}-silenced").with_suffix(".wav")
-    silence_map = base.with_name(f"{base.name}-silence_map").with_suffix(".tsv")
-    return speech_audio, silence_map
+# Works on plain strings; these run for every /sessions row and Path algebra is costly
+def _related_speech_paths(wav: str) -> Tuple[str, str]:
+    base = os.path.splitext(wav)[0]
+    return f"{base}-silenced.wav", f"{base}-silence_map.tsv"
+
+
+# Directories modified more recently than this are re-listed rather than cached
+_DIR_CACHE_SETTLE_NS = 2_000_000_000
+
+
+# Lists the entry names of a directory, cached until the directory's mtime changes
+# Lets /sessions answer existence checks with set lookups instead of one stat per file
+@lru_cache(maxsize=1024)
+def _dir_names_cached(dir_str: str, mtime_ns: int) -> frozenset:
+    try:
+        with os.scandir(dir_str) as it:
+            return frozenset(entry.name for entry in it)
+    except OSError:
+        return frozenset()
+
+
+def _dir_names(dir_str: str) -> frozenset:
+    try:
+        mtime_ns = os.stat(dir_str).st_mtime_ns
+    except OSError:
+        return frozenset()
+    # Coarse filesystem timestamps can hide a change made within the same tick
+    if time.time_ns() - mtime_ns < _DIR_CACHE_SETTLE_NS:
+        return _dir_names_cached.__wrapped__(dir_str, mtime_ns)
+    return _dir_names_cached(dir_str, mtime_ns)
+
+
+# Checks if a file exists using the cached listing of its parent directory
+def _file_exists(path: str) -> bool:
+    parent, name = os.path.split(path)
+    return name in _dir_names(parent)
 
 
 # Checks which speech processing assets exist for a given WAV file
 # Returns actual paths only if files exist, otherwise None
 # Used to determine if post-processing has been completed
-def _existing_speech_assets(wav: Path) -> Tuple[Optional[Path], Optional[Path]]:
+def _existing_speech_assets(wav: str) -> Tuple[Optional[str], Optional[str]]:
     speech_audio, silence_map = _related_speech_paths(wav)
+    names = _dir_names(os.path.dirname(wav))
     return (
-        speech_audio if speech_audio.exists() else None,
-        silence_map if silence_map.exists() else None,
+        speech_audio if os.path.basename(speech_audio) in names else None,
+        silence_map if os.path.basename(silence_map) in names else None,
     )
 
 
+# Builds the /files URL for a path under the repository root
+# ROOT is fixed at import, so this is a prefix slice instead of Path.relative_to
+def _files_url(path: str) -> str:
+    if path.startswith(_ROOT_PREFIX):
+        rel = path[len(_ROOT_PREFIX):]
+        return "/files/" + (rel.replace("\\", "/") if _IS_WIN else rel)
+    return f"/files/{Path(path).relative_to(ROOT).as_posix()}"
+
+
 # Reads silence spans from a TSV file
 # Each line contains start_ms and end_ms separated by tab
-# Returns sorted list of (start_ms, end_ms) tuples representing silence periods
-def _read_silence_map(path: Path) -> List[Tuple[int, int]]:
-    spans: List[Tuple[int, int]] = []
+# Returns an (N, 2) int64 array of (start_ms, end_ms) silence periods sorted by start
+def _read_silence_map(path: Path) -> np.ndarray:
     try:
-        with path.open("r", encoding="utf-8") as fh:
-            for raw in fh:
-                line = raw.strip()
-                # Skip empty lines
-                if not line:
-                    continue
-                # Skip header row
-                if line.lower().startswith("start_ms"):
-                    continue
-                # Parse tab-separated values
-                parts = line.split("	")
-                if len(parts) < 2:
-                    continue
-                try:
-                    start = int(parts[0])
-                    end = int(parts[1])
-                except ValueError:
-                    continue
-                # Validate span is valid
-                if end < start:
-                    continue
-                spans.append((start, end))
+        with open(path, "rb") as fh:
+            data = fh.read()
     except FileNotFoundError:
-        return []
-    # Sort by start time for processing
-    spans.sort()
-    return spans
+        return np.empty((0, 2), dtype=np.int64)
+    # Skip header row
+    skip = 1 if data.lstrip()[:8].lower() == b"start_ms" else 0
+    try:
+        # Whole-buffer parse in numpy's C reader instead of a Python loop per line
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)  # empty map
+            arr = np.loadtxt(
+                io.BytesIO(data),
+                dtype=np.int64,
+                delimiter="\t",
+                usecols=(0, 1),
+                skiprows=skip,
+                comments=None,
+                ndmin=2,
+            )
+    except ValueError:
+        # Malformed rows - fall back to the tolerant line parser
+        arr = _parse_silence_lines(data.decode("utf-8", errors="replace"))
+    # Validate span is valid
+    arr = arr[arr[:, 1] >= arr[:, 0]]
+    # speech_silence writes maps in start order; only older or hand-edited files need sorting
+    starts = arr[:, 0]
+    if starts.size > 1 and bool(np.any(starts[1:] < starts[:-1])):
+        arr = arr[np.argsort(starts, kind="stable")]
+    return arr
+
+
+# Line-by-line parser that skips blank, header and malformed rows
+def _parse_silence_lines(text: str) -> np.ndarray:
+    spans: List[Tuple[int, int]] = []
+    for raw in text.splitlines():
+        line = raw.strip()
+        # Skip empty lines and header row
+        if not line or line.lower().startswith("start_ms"):
+            continue
+        # Parse tab-separated values
+        parts = line.split("\t")
+        if len(parts) < 2:
+            continue
+        try:
+            spans.append((int(parts[0]), int(parts[1])))
+        except ValueError:
+            continue
+    return np.asarray(spans, dtype=np.int64).reshape(-1, 2)
 
 
 # Merges overlapping or adjacent silence intervals
-# Takes sorted list of (start, end) tuples and combines overlapping ranges
+# Takes (N, 2) spans sorted by start and combines overlapping ranges
+# Returns an (N, 2) int64 array of disjoint spans ordered by start
 # Example: [(0,10), (5,15), (20,30)] -> [(0,15), (20,30)]
-def _merge_intervals(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
-    if not spans:
-        return []
-    merged: List[Tuple[int, int]] = []
-    cur_start, cur_end = spans[0]
-    # Iterate through sorted spans and merge overlaps
-    for start, end in spans[1:]:
-        # If current span overlaps or touches previous, extend it
-        if start <= cur_end:
-            cur_end = max(cur_end, end)
-        else:
-            # No overlap - save previous span and start new one
-            merged.append((cur_start, cur_end))
-            cur_start, cur_end = start, end
-    # Don't forget the last span
-    merged.append((cur_start, cur_end))
+def _merge_intervals(spans: np.ndarray) -> np.ndarray:
+    if spans.shape[0] == 0:
+        return spans
+    starts = spans[:, 0]
+    ends = spans[:, 1]
+    # A span opens a new group when it starts after every earlier span has ended
+    running_end = np.maximum.accumulate(ends)
+    breaks = np.flatnonzero(starts[1:] > running_end[:-1]) + 1
+    group_idx = np.concatenate(([0], breaks))
+    merged = np.empty((group_idx.size, 2), dtype=np.int64)
+    merged[:, 0] = starts[group_idx]
+    merged[:, 1] = np.maximum.reduceat(ends, group_idx)
     return merged
 
 
@@ -159,72 +271,76 @@ def _merge_intervals(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
 # Creates bidirectional mapping between original audio time and speech-only time
 # Returns timeline with segments, silence spans, and total durations
 # This enables playing speech-only audio while displaying original timestamps
-def _load_speech_timeline(path: Path, *, total_ms: Optional[int] = None) -> Optional[Dict[str, Any]]:
+def _load_speech_timeline(path: str, *, total_ms: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime_ns = 0
+    # Silence maps are written once by post-processing; the mtime invalidates stale entries
+    return _load_speech_timeline_cached(path, mtime_ns, total_ms)
+
+
+# Cached timeline builder - the returned dict is shared between requests and must not be mutated
+@lru_cache(maxsize=512)
+def _load_speech_timeline_cached(
+    path_str: str, mtime_ns: int, total_ms: Optional[int]
+) -> Optional[Dict[str, Any]]:
     # Read raw silence spans from TSV file
-    spans = _read_silence_map(path)
-    if not spans and total_ms is None:
+    spans = _read_silence_map(Path(path_str))
+    if spans.shape[0] == 0 and total_ms is None:
         return None
     # Merge overlapping silence periods
     merged = _merge_intervals(spans)
-    if not merged and total_ms is None:
+    if merged.shape[0] == 0 and total_ms is None:
         return None
+    sil_start = merged[:, 0]
+    sil_end = merged[:, 1]
     # Determine total duration of original audio
-    total_original = total_ms if total_ms is not None else (merged[-1][1] if merged else 0)
-    # Build segments list - each segment maps a speech region to its original time
-    segments: List[Dict[str, int]] = []
-    speech_cursor = 0  # Current position in speech-only timeline
-    cur = 0  # Current position in original timeline
-    # Process each silence span to extract speech segments
-    for start, end in merged:
-        start = max(cur, start)
-        # The region before this silence is speech - add it as a segment
-        if start > cur:
-            dur = start - cur
-            if dur > 0:
-                # Record this speech segment with both original and speech-only timestamps
-                segments.append(
-                    {
-                        "original_start_ms": cur,
-                        "original_end_ms": start,
-                        "speech_start_ms": speech_cursor,
-                        "speech_end_ms": speech_cursor + dur,
-                        "duration_ms": dur,
-                    }
-                )
-                speech_cursor += dur
-        # Skip past this silence in original timeline
-        cur = max(cur, end)
+    total_original = total_ms if total_ms is not None else (int(sil_end[-1]) if merged.shape[0] else 0)
+    # Speech is the gap before each silence: from the previous silence end (or 0) up to this start
+    gap_start = np.maximum(np.concatenate(([0], sil_end))[:-1], 0)
+    gap_end = np.maximum(gap_start, sil_start)
     # Handle any remaining speech after the last silence
-    if cur < total_original:
-        dur = total_original - cur
-        if dur > 0:
-            # Add final speech segment
-            segments.append(
-                {
-                    "original_start_ms": cur,
-                    "original_end_ms": total_original,
-                    "speech_start_ms": speech_cursor,
-                    "speech_end_ms": speech_cursor + dur,
-                    "duration_ms": dur,
-                }
-            )
-            speech_cursor += dur
-        cur = total_original
-    # Build silence spans list for reference
+    tail = max(0, int(sil_end[-1])) if merged.shape[0] else 0
+    if tail < total_original:
+        gap_start = np.append(gap_start, tail)
+        gap_end = np.append(gap_end, total_original)
+    keep = gap_end > gap_start
+    orig_start = gap_start[keep]
+    orig_end = gap_end[keep]
+    # Speech-only timeline is the running sum of segment durations
+    dur = orig_end - orig_start
+    speech_end = np.cumsum(dur)
+    speech_start = speech_end - dur
+    speech_total = int(speech_end[-1]) if speech_end.size else 0
+    # Build segments list - each segment maps a speech region to its original time
+    segments: List[Dict[str, int]] = [
+        {
+            "original_start_ms": os_,
+            "original_end_ms": oe,
+            "speech_start_ms": ss,
+            "speech_end_ms": se,
+            "duration_ms": d,
+        }
+        for os_, oe, ss, se, d in zip(
+            orig_start.tolist(), orig_end.tolist(), speech_start.tolist(), speech_end.tolist(), dur.tolist()
+        )
+    ]
+    # Build silence spans list for reference; durations come from one array op like the segments
     silence_payload = [
         {
             "start_ms": start,
             "end_ms": end,
-            "duration_ms": max(0, end - start),
+            "duration_ms": d,
         }
-        for start, end in merged
+        for start, end, d in zip(sil_start.tolist(), sil_end.tolist(), np.maximum(sil_end - sil_start, 0).tolist())
     ]
     # Return complete timeline data structure
     return {
         "segments": segments,  # Speech segments with time mapping
         "silence_spans": silence_payload,  # All silence periods
         "total_original_ms": total_original,  # Duration of original audio
-        "total_speech_ms": speech_cursor,  # Duration of speech-only audio
+        "total_speech_ms": speech_total,  # Duration of speech-only audio
     }
 
 
@@ -233,7 +349,39 @@ def _load_speech_timeline(path: Path, *, total_ms: Optional[int] = None) -> Opti
 # Returns None if file cannot be read or has invalid metadata
 def _wav_duration_ms(path: Path) -> Optional[int]:
     try:
-        with wave.open(str(path), "rb") as wf:
+        st = os.stat(path)
+    except OSError:
+        return None
+    # Finalized recordings never change, so (mtime, size) is a safe cache key
+    return _wav_duration_cached(str(path), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=4096)
+def _wav_duration_cached(path_str: str, mtime_ns: int, size: int) -> Optional[int]:
+    try:
+        with open(path_str, "rb") as fh:
+            hdr = fh.read(44)
+    except OSError:
+        return None
+    # Canonical 44-byte PCM header: RIFF/WAVE, 16-byte fmt chunk, then data chunk
+    if (
+        len(hdr) == 44
+        and hdr[0:4] == b"RIFF"
+        and hdr[8:12] == b"WAVE"
+        and hdr[12:16] == b"fmt "
+        and hdr[36:40] == b"data"
+    ):
+        channels, rate = struct.unpack("<HI", hdr[22:28])
+        bits = struct.unpack("<H", hdr[34:36])[0]
+        data_size = struct.unpack("<I", hdr[40:44])[0]
+        frame_bytes = channels * (bits // 8)
+        if rate > 0 and frame_bytes > 0:
+            # Clamp to what is on disk in case the header was not finalized
+            frames = min(data_size, size - 44) // frame_bytes
+            return int(round(frames * 1000.0 / rate))
+    # Non-canonical layout (extra chunks, extensible fmt) - let wave walk the chunks
+    try:
+        with wave.open(path_str, "rb") as wf:
             frames = wf.getnframes()
             rate = wf.getframerate()
             # Validate metadata
@@ -245,32 +393,40 @@ def _wav_duration_ms(path: Path) -> Optional[int]:
         return None
 
 
+# Matches one transcript line: either "[start_sec -> end_sec] text" or a bare text line
+# Compiled once and run with finditer over the whole transcript instead of per line
+_TRANSCRIPT_LINE = re.compile(
+    r"^[^\S\n]*(?:\[(\d+(?:\.\d+)?)s[^\S\r\n]*->[^\S\r\n]*(\d+(?:\.\d+)?)s\][^\S\r\n]*([^\r\n]+?)"
+    r"|(\S[^\r\n]*?))[^\S\n]*$",
+    re.MULTILINE,
+)
+
+
+# Converts a "12.345" seconds string to whole milliseconds without a float round-trip
+def _sec_to_ms(raw: str) -> int:
+    whole, _, frac = raw.partition(".")
+    return int(whole) * 1000 + int((frac + "00")[:3])
+
+
 # Parses transcript text with timestamp brackets into structured data
 # Input format: "[1.23s -> 4.56s] transcribed text"
 # Returns list of dicts with id, start_ms, end_ms, and text fields
 def parse_bracketed_transcript(txt: str) -> List[Dict[str, Any]]:
     lines = []
-    # Regex to match: [start_sec -> end_sec] text
-    re_ln = re.compile(r"^\s*\[(\d+(?:\.\d+)?)s\s*->\s*(\d+(?:\.\d+)?)s\]\s*(.+?)\s*$")
-    idx = 0
-    for raw in txt.splitlines():
-        m = re_ln.match(raw)
-        if not m:
-            # Handle non-timestamped lines
-            if raw.strip():
-                # Preserve as text-only line without timestamps
-                lines.append({
-                    "id": idx,
-                    "start_ms": None,
-                    "end_ms": None,
-                    "text": raw.strip(),
-                })
-                idx += 1
+    for idx, m in enumerate(_TRANSCRIPT_LINE.finditer(txt)):
+        start_raw, end_raw, text, plain = m.groups()
+        if plain is not None:
+            # Preserve non-timestamped lines as text-only entries
+            lines.append({
+                "id": idx,
+                "start_ms": None,
+                "end_ms": None,
+                "text": plain,
+            })
             continue
         # Extract timestamps and convert seconds to milliseconds
-        start_ms = int(float(m.group(1)) * 1000)
-        end_ms = int(float(m.group(2)) * 1000)
-        text = m.group(3)
+        start_ms = _sec_to_ms(start_raw)
+        end_ms = _sec_to_ms(end_raw)
         # Add parsed line to results
         lines.append({
             "id": idx,
@@ -278,12 +434,20 @@ def parse_bracketed_transcript(txt: str) -> List[Dict[str, Any]]:
             "end_ms": max(end_ms, start_ms),  # Ensure end >= start
             "text": text,
         })
-        idx += 1
     return lines
 
 
+# JSON response rendered with orjson, which encodes the session/manifest payloads
+# much faster than the stdlib encoder used by JSONResponse
+class _OrjsonResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+_JSONResponse = _OrjsonResponse if orjson is not None else JSONResponse
+
 # FastAPI application for audio transcription sessions
-app = FastAPI(title="Audio Sessions API")
+app = FastAPI(title="Audio Sessions API", default_response_class=_JSONResponse)
 
 # Enable CORS for all origins to allow web UI access
 app.add_middleware(
@@ -295,12 +459,30 @@ app.add_middleware(
 )
 
 
+# Worker threads available to the blocking DB/filesystem helpers behind the async endpoints
+THREADPOOL_SIZE = int(os.getenv("SERVER_THREADPOOL_SIZE", "100"))
+
+
+@app.on_event("startup")
+async def _size_threadpool() -> None:
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+
+@app.on_event("shutdown")
+def _close_pool() -> None:
+    while True:
+        try:
+            _POOL.get_nowait().close()
+        except queue.Empty:
+            break
+
+
 @app.middleware("http")
 async def add_files_cors_headers(request: Request, call_next):
     try:
         response = await call_next(request)
     except HTTPException as exc:
-        response = JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+        response = _JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
     if request.url.path.startswith("/files"):
         response.headers["Access-Control-Allow-Origin"] = "*"
         response.headers["Access-Control-Expose-Headers"] = (
@@ -309,17 +491,45 @@ async def add_files_cors_headers(request: Request, call_next):
         response.headers.setdefault("Vary", "Origin")
     return response
 
+# Chunk size for streaming audio when the ASGI server lacks the pathsend extension
+# Starlette already hands the path to the server for zero-copy sendfile when it is offered
+_FILE_CHUNK_SIZE = 1 << 20
+
+
+class _LargeFileResponse(FileResponse):
+    chunk_size = _FILE_CHUNK_SIZE
+
+
+# StaticFiles variant that streams with the larger chunk size
+class _AudioStaticFiles(StaticFiles):
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if isinstance(response, FileResponse):
+            response.chunk_size = _FILE_CHUNK_SIZE
+        return response
+
+
 # Serve static files (audio, silence maps, etc.) with HTTP range request support
 # This enables seeking in audio players
-app.mount("/files", StaticFiles(directory=str(ROOT), html=False), name="files")
+app.mount("/files", _AudioStaticFiles(directory=str(ROOT), html=False), name="files")
+
+
+# Internal nginx location that serves validated /files_abs paths (see nginx.example.conf)
+# When set, the API only checks the path and nginx streams the file with sendfile
+FILES_ABS_ACCEL_PREFIX = os.getenv("FILES_ABS_ACCEL_PREFIX", "").rstrip("/")
 
 
 @app.get("/files_abs")
-def files_absolute(path: str) -> FileResponse:
+def files_absolute(path: str) -> Response:
     file_path = _resolve_allowed_file(path)
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(
+    if FILES_ABS_ACCEL_PREFIX:
+        return Response(
+            status_code=200,
+            headers={"X-Accel-Redirect": FILES_ABS_ACCEL_PREFIX + quote(file_path.as_posix(), safe="/:")},
+        )
+    return _LargeFileResponse(
         file_path,
         headers={
             "Access-Control-Allow-Origin": "*",
@@ -345,37 +555,100 @@ async def files_absolute_options() -> PlainTextResponse:
 
 # Lists all audio recording sessions from the database
 # Returns session metadata including file paths and URLs to audio assets
-@app.get("/sessions")
-def list_sessions() -> JSONResponse:
+def _list_sessions_sync() -> List[Dict[str, Any]]:
     with _db() as conn:
-        cur = conn.execute(
+        cur = conn.cursor()
+        # Plain tuples: each row becomes exactly one dict, built below
+        cur.row_factory = None
+        tuples = cur.execute(
             "SELECT id, title, file_path, device, sample_rate, channels, model, start_time, end_time, status"
             " FROM audio_sessions ORDER BY id DESC"
-        )
-        rows = [dict(r) for r in cur.fetchall()]
-    # Enhance each session row with file URLs for audio assets
-    for r in rows:
-        file_path = r.get("file_path") or ""
-        wav = _norm_path(file_path)
-        r["file_path"] = str(wav)
-        # URL for original recorded audio
-        r["original_audio_url"] = f"/files/{wav.relative_to(ROOT).as_posix()}" if wav.exists() else None
+        ).fetchall()
+        # Names whose latest transcript is non-blank, so the list can show transcript
+        # availability without a /manifest call per session. SQLite takes the bare
+        # columns from the row that holds MAX(created_at).
+        with_transcript = {
+            name
+            for name, nonblank, _ in cur.execute(
+                "SELECT name, length(trim(transcription, ' \t\r\n')) > 0, MAX(created_at)"
+                " FROM audio_transcriptions GROUP BY name"
+            )
+            if nonblank
+        }
+    norm_path = _norm_path
+    rows: List[Dict[str, Any]] = []
+    # Build each session dict in one pass, with file URLs for audio assets
+    for sid, title, file_path, device, sample_rate, channels, model, start_time, end_time, status in tuples:
+        wav = str(norm_path(file_path or ""))
         # Check for post-processed speech-only audio and silence map
         speech_audio, silence_map = _existing_speech_assets(wav)
         has_pair = speech_audio is not None and silence_map is not None
-        # URL for speech-only audio (if available)
-        r["speech_audio_url"] = (
-            f"/files/{speech_audio.relative_to(ROOT).as_posix()}"
-            if has_pair and speech_audio is not None
-            else None
-        )
-        # URL for silence map TSV (if available)
-        r["silence_map_url"] = (
-            f"/files/{silence_map.relative_to(ROOT).as_posix()}"
-            if silence_map is not None
-            else None
-        )
-    return JSONResponse(rows)
+        rows.append({
+            "id": sid,
+            "title": title,
+            "file_path": wav,
+            "device": device,
+            "sample_rate": sample_rate,
+            "channels": channels,
+            "model": model,
+            "start_time": start_time,
+            "end_time": end_time,
+            "status": status,
+            # URL for original recorded audio
+            "original_audio_url": _files_url(wav) if _file_exists(wav) else None,
+            # URL for speech-only audio (if available)
+            "speech_audio_url": _files_url(speech_audio) if has_pair and speech_audio is not None else None,
+            # URL for silence map TSV (if available)
+            "silence_map_url": _files_url(silence_map) if silence_map is not None else None,
+            # Same check as the manifest's transcript.raw_url
+            "has_transcript": bool(file_path) and canonicalize_path(file_path) in with_transcript,
+        })
+    return rows
+
+
+@app.get("/sessions")
+async def list_sessions() -> JSONResponse:
+    rows = await anyio.to_thread.run_sync(_list_sessions_sync)
+    return _JSONResponse(rows)
+
+
+# Weak ETag derived from the values a response is built from
+# crc32 keeps it stable across server restarts, unlike hash()
+def _make_etag(*parts: Any) -> str:
+    digest = zlib.crc32(repr(parts).encode("utf-8"))
+    return f'W/"{parts[0]}-{digest:08x}"'
+
+
+# Checks an If-None-Match header against an ETag (weak comparison)
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == bare:
+            return True
+    return False
+
+
+# Short private caching lets the player poll without refetching unchanged data
+def _cache_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": "private, max-age=5"}
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=_cache_headers(etag))
+
+
+def _mtime_ns(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
 
 
 # Helper to fetch a session by ID or raise 404 error
@@ -390,31 +663,56 @@ def _get_session(conn: sqlite3.Connection, session_id: int) -> sqlite3.Row:
 
 # Returns session manifest with audio URLs, timeline data, and transcript info
 # Provides all metadata needed for the web player UI
-@app.get("/sessions/{session_id}/manifest")
-def manifest(session_id: int) -> JSONResponse:
+def _manifest_sync(session_id: int, if_none_match: Optional[str] = None) -> Tuple[str, Optional[Dict[str, Any]]]:
     with _db() as conn:
         s = _get_session(conn, session_id)
         # Validate audio file exists
-        wav = _norm_path(s["file_path"]) if s["file_path"] else None
-        if wav is None or not wav.exists():
+        wav = str(_norm_path(s["file_path"])) if s["file_path"] else None
+        try:
+            wav_st = os.stat(wav) if wav is not None else None
+        except OSError:
+            wav_st = None
+        if wav is None or wav_st is None:
             raise HTTPException(status_code=404, detail="Audio file not found for session")
         # Check for post-processed assets
         speech_audio, silence_map = _existing_speech_assets(wav)
-        # Get audio duration from WAV metadata
-        duration_ms = _wav_duration_ms(wav)
-        # Load timeline if silence map exists - enables time conversion in UI
-        timeline = _load_speech_timeline(silence_map, total_ms=duration_ms) if silence_map else None
 
         # Check if transcript is available for this session
         canonical = canonicalize_path(s["file_path"]) if s["file_path"] else None
         transcript_present = False
+        transcript_created = None
         if canonical:
+            # Only ask SQLite whether the latest transcript is non-blank; avoids pulling the text
             cur = conn.execute(
-                "SELECT transcription FROM audio_transcriptions WHERE name = ? ORDER BY created_at DESC LIMIT 1",
+                "SELECT length(trim(transcription, ' \t\r\n')) > 0, created_at FROM audio_transcriptions"
+                " WHERE name = ? ORDER BY created_at DESC LIMIT 1",
                 (canonical,),
             )
             trow = cur.fetchone()
-            transcript_present = bool(trow and (trow[0] or "").strip())
+            transcript_present = bool(trow and trow[0])
+            transcript_created = trow[1] if trow else None
+
+    # Everything the manifest is derived from; unchanged inputs mean an unchanged body
+    etag = _make_etag(
+        session_id,
+        s["title"],
+        s["end_time"],
+        s["status"],
+        wav_st.st_mtime_ns,
+        wav_st.st_size,
+        speech_audio,
+        silence_map,
+        _mtime_ns(silence_map) if silence_map else None,
+        transcript_created,
+        transcript_present,
+    )
+    if _etag_matches(if_none_match, etag):
+        return etag, None
+
+    # Get audio duration from WAV metadata
+    duration_ms = _wav_duration_ms(wav)
+    # Load timeline if silence map exists - enables time conversion in UI
+    timeline = _load_speech_timeline(silence_map, total_ms=duration_ms) if silence_map else None
 
     # Build manifest JSON with all session information
     man = {
@@ -422,64 +720,112 @@ def manifest(session_id: int) -> JSONResponse:
         "title": s["title"],
         "duration": duration_ms,  # Total duration in milliseconds
         "audio": {
-            "original_url": f"/files/{wav.relative_to(ROOT).as_posix()}",  # Full recording with silence
+            "original_url": _files_url(wav),  # Full recording with silence
             "speech_url": (  # Speech-only version (if available)
-                f"/files/{speech_audio.relative_to(ROOT).as_posix()}"
-                if speech_audio is not None and silence_map is not None
-                else None
+                _files_url(speech_audio) if speech_audio is not None and silence_map is not None else None
             ),
             "timeline": timeline,  # Time mapping for speech-only playback
         },
-        "silence_map_url": (  # TSV file with silence intervals
-            f"/files/{silence_map.relative_to(ROOT).as_posix()}" if silence_map is not None else None
-        ),
+        "silence_map_url": _files_url(silence_map) if silence_map is not None else None,  # TSV with silence intervals
         "transcript": {
             "format": "bracketed_text",  # Format identifier for parser
             "url": f"/sessions/{session_id}/transcript",  # Structured JSON
             "raw_url": f"/sessions/{session_id}/transcript.txt" if transcript_present else None,  # Plain text
         },
     }
-    return JSONResponse(man)
+    return etag, man
+
+
+@app.get("/sessions/{session_id}/manifest")
+async def manifest(session_id: int, request: Request) -> Response:
+    etag, man = await anyio.to_thread.run_sync(
+        _manifest_sync, session_id, request.headers.get("if-none-match")
+    )
+    if man is None:
+        return _not_modified(etag)
+    return _JSONResponse(man, headers=_cache_headers(etag))
+
+
+# Parses and serializes a transcript once per stored revision
+# Rows are upserted with a fresh created_at, so (name, id, created_at) identifies the text
+@lru_cache(maxsize=256)
+def _transcript_json_bytes(canonical: str, row_id: int, created_at: str) -> Optional[bytes]:
+    with _db() as conn:
+        row = conn.execute(
+            "SELECT transcription FROM audio_transcriptions WHERE id = ? AND created_at = ?",
+            (row_id, created_at),
+        ).fetchone()
+    if row is None or not row[0]:
+        return None
+    items = parse_bracketed_transcript(row[0])
+    if orjson is not None:
+        return orjson.dumps(items)
+    return json.dumps(items, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# Finds the id and created_at of the latest transcript for a session, or raises 404
+def _latest_transcript_ref(conn: sqlite3.Connection, session_id: int) -> Tuple[str, int, str]:
+    s = _get_session(conn, session_id)
+    if not s["file_path"]:
+        raise HTTPException(status_code=404, detail="Transcript not found for session")
+    canonical = canonicalize_path(s["file_path"])
+    cur = conn.execute(
+        "SELECT id, created_at FROM audio_transcriptions WHERE name = ? ORDER BY created_at DESC LIMIT 1",
+        (canonical,),
+    )
+    row = cur.fetchone()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Transcript not found for session")
+    return canonical, row[0], row[1]
 
 
 # Returns structured transcript as JSON array
 # Each item contains id, start_ms, end_ms, and text
-@app.get("/sessions/{session_id}/transcript")
-def transcript_json(session_id: int) -> JSONResponse:
+def _transcript_json_sync(session_id: int, if_none_match: Optional[str] = None) -> Tuple[str, Optional[bytes]]:
     with _db() as conn:
-        s = _get_session(conn, session_id)
-        if not s["file_path"]:
-            raise HTTPException(status_code=404, detail="Transcript not found for session")
-        canonical = canonicalize_path(s["file_path"])
-        cur = conn.execute(
-            "SELECT transcription FROM audio_transcriptions WHERE name = ? ORDER BY created_at DESC LIMIT 1",
-            (canonical,),
-        )
-        row = cur.fetchone()
-        if row is None or not row[0]:
-            raise HTTPException(status_code=404, detail="Transcript not found for session")
-        items = parse_bracketed_transcript(row[0])
-    return JSONResponse(items)
+        # Look up only the identity of the latest transcript; the text is read on cache miss
+        canonical, row_id, created_at = _latest_transcript_ref(conn, session_id)
+    etag = _make_etag(session_id, row_id, created_at)
+    if _etag_matches(if_none_match, etag):
+        return etag, None
+    body = _transcript_json_bytes(canonical, row_id, created_at)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Transcript not found for session")
+    return etag, body
+
+
+@app.get("/sessions/{session_id}/transcript")
+async def transcript_json(session_id: int, request: Request) -> Response:
+    etag, body = await anyio.to_thread.run_sync(
+        _transcript_json_sync, session_id, request.headers.get("if-none-match")
+    )
+    if body is None:
+        return _not_modified(etag)
+    return Response(content=body, media_type="application/json", headers=_cache_headers(etag))
 
 
 # Returns raw transcript text without parsing
 # Useful for downloading or viewing plain text
-@app.get("/sessions/{session_id}/transcript.txt")
-def transcript_raw(session_id: int) -> PlainTextResponse:
+def _transcript_raw_sync(session_id: int, if_none_match: Optional[str] = None) -> Tuple[str, Optional[str]]:
     with _db() as conn:
-        s = _get_session(conn, session_id)
-        if not s["file_path"]:
-            raise HTTPException(status_code=404, detail="Transcript not found for session")
-        canonical = canonicalize_path(s["file_path"])
-        cur = conn.execute(
-            "SELECT transcription FROM audio_transcriptions WHERE name = ? ORDER BY created_at DESC LIMIT 1",
-            (canonical,),
-        )
-        row = cur.fetchone()
-        if row is None or not row[0]:
-            raise HTTPException(status_code=404, detail="Transcript not found for session")
-        txt = row[0]
-    return PlainTextResponse(txt)
+        _, row_id, created_at = _latest_transcript_ref(conn, session_id)
+        etag = _make_etag(session_id, row_id, created_at, "txt")
+        if _etag_matches(if_none_match, etag):
+            return etag, None
+        row = conn.execute("SELECT transcription FROM audio_transcriptions WHERE id = ?", (row_id,)).fetchone()
+    if row is None or not row[0]:
+        raise HTTPException(status_code=404, detail="Transcript not found for session")
+    return etag, row[0]
+
+
+@app.get("/sessions/{session_id}/transcript.txt")
+async def transcript_raw(session_id: int, request: Request) -> Response:
+    etag, txt = await anyio.to_thread.run_sync(
+        _transcript_raw_sync, session_id, request.headers.get("if-none-match")
+    )
+    if txt is None:
+        return _not_modified(etag)
+    return PlainTextResponse(txt, headers=_cache_headers(etag))
 
 
 # Health check endpoint for monitoring
@@ -489,3 +835,4 @@ def healthz() -> Dict[str, str]:
 
 
 # Run: uvicorn server:app --reload
+# Behind nginx (sendfile for /files, X-Accel-Redirect for /files_abs): see nginx.example.conf
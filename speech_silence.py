@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, Optional, Tuple
 
 import wave
 import numpy as np
@@ -12,6 +13,18 @@ try:
     import webrtcvad  # type: ignore
 except Exception:
     webrtcvad = None  # optional dependency
+try:
+    from numba import njit  # type: ignore
+except Exception:
+    njit = None  # optional dependency; compiles the per-sample loops below
+try:
+    from scipy.signal import lfilter  # type: ignore
+except Exception:
+    lfilter = None  # optional dependency
+try:
+    import scipy.fft as _sp_fft  # type: ignore
+except Exception:
+    _sp_fft = None  # optional dependency; numpy's rfft is used instead
 
 
 @dataclass
@@ -33,6 +46,7 @@ class Params:
     centroid_high_hz: int = 4500
     require_consecutive_on: int = 3
     hangover_off: int = 2
+    refine_with_features: bool = True  # False: trust WebRTC VAD alone and skip the feature gates
 
 
 @dataclass
@@ -48,31 +62,37 @@ class Result:
     segment_count: int
 
 
-def _read_wav_mono(path: Path) -> Tuple[np.ndarray, int, int]:
-    with wave.open(str(path), "rb") as wf:
-        n_channels = wf.getnchannels()
-        sampwidth = wf.getsampwidth()
-        framerate = wf.getframerate()
-        n_frames = wf.getnframes()
-        frames = wf.readframes(n_frames)
+# int16 PCM -> float32 in [-1, 1)
+_PCM16_SCALE = np.float32(1.0 / 32768.0)
 
-    if sampwidth != 2:
-        raise ValueError(f"Only 16-bit PCM WAV supported (got sampwidth={sampwidth} bytes)")
 
-    data = np.frombuffer(frames, dtype=np.int16)
+def _read_wav_mono(path: Path) -> Tuple[np.ndarray, int, int]:
+    with open(path, "rb") as fh:
+        with wave.open(fh, "rb") as wf:
+            n_channels = wf.getnchannels()
+            sampwidth = wf.getsampwidth()
+            framerate = wf.getframerate()
+            n_frames = wf.getnframes()
+            if sampwidth != 2:
+                raise ValueError(f"Only 16-bit PCM WAV supported (got sampwidth={sampwidth} bytes)")
+            # wave stops parsing at the start of the data chunk, so the samples can be read
+            # straight into a preallocated array instead of via an intermediate bytes object
+            data = np.empty(n_frames * n_channels, dtype=np.int16)
+            got = fh.readinto(memoryview(data).cast("B"))
+    # Header may overstate the length of an unfinished recording
+    if got < data.nbytes:
+        data = data[: (got // (2 * n_channels)) * n_channels]
     if n_channels > 1:
-        data = data.reshape(-1, n_channels).astype(np.int32)
-        mono = np.mean(data, axis=1)
-        data = np.clip(mono, -32768, 32767).astype(np.int16)
-    data_f32 = (data.astype(np.float32)) / 32768.0
+        # Average channels straight into float32; no int32 copy or int16 round-trip
+        data_f32 = data.reshape(-1, n_channels).mean(axis=1, dtype=np.float32)
+        data_f32 *= _PCM16_SCALE
+    else:
+        data_f32 = data.astype(np.float32) * _PCM16_SCALE
     return data_f32, framerate, n_channels
 
 
-def _dc_block(x: np.ndarray, r: float = 0.995) -> np.ndarray:
-    # Simple DC blocker / high-pass filter
-    if x.size == 0:
-        return x
-    y = np.empty_like(x)
+def _dc_block_loop(x: np.ndarray, r: float, y: np.ndarray) -> np.ndarray:
+    # Each input sample is read before its output is stored, so y may alias x
     prev_x = 0.0
     prev_y = 0.0
     for i in range(x.size):
@@ -84,10 +104,33 @@ def _dc_block(x: np.ndarray, r: float = 0.995) -> np.ndarray:
     return y
 
 
+# Native version of the recurrence when numba is installed (compiled once, cached on disk)
+_dc_block_nb = njit(cache=True, fastmath=True)(_dc_block_loop) if njit is not None else None
+
+
+def _dc_block(x: np.ndarray, r: float = 0.995, inplace: bool = False) -> np.ndarray:
+    # Simple DC blocker / high-pass filter
+    # inplace=True overwrites x (float32) when the loop kernels are used, so long
+    # recordings hold one float32 copy of the signal instead of two
+    if x.size == 0:
+        return x
+    if _dc_block_nb is not None:
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        return _dc_block_nb(x, r, x if inplace else np.empty_like(x))
+    if lfilter is not None:
+        # Same recurrence as a first-order IIR: y[n] = x[n] - x[n-1] + r*y[n-1]
+        b = np.array([1.0, -1.0], dtype=np.float32)
+        a = np.array([1.0, -r], dtype=np.float32)
+        return lfilter(b, a, x).astype(np.float32, copy=False)
+    return _dc_block_loop(x, r, x if inplace else np.empty_like(x))
+
+
 def _frame_signal(x: np.ndarray, sr: int, frame_ms: int) -> Tuple[np.ndarray, int]:
     frame_len = int(sr * frame_ms / 1000)
     if frame_len <= 0:
         raise ValueError("frame_ms too small for given sample rate")
+    # Every feature helper relies on float32 frames and skips its own conversion
+    assert x.dtype == np.float32, x.dtype
     n_frames = len(x) // frame_len
     if n_frames == 0:
         return np.empty((0, frame_len), dtype=np.float32), frame_len
@@ -105,169 +148,210 @@ def _vad_webrtc_mask(frames: np.ndarray, sr: int, frame_ms: int, aggr: int) -> n
 
     vad = webrtcvad.Vad(int(aggr))
     mask = np.zeros(frames.shape[0], dtype=bool)
-    for i, fr in enumerate(frames):
-        pcm16 = np.clip(fr, -1.0, 1.0)
-        pcm16 = (pcm16 * 32767.0).astype(np.int16)
+    # Quantize every frame to int16 in one vectorized pass, then hand out zero-copy slices
+    pcm16 = (np.clip(frames, -1.0, 1.0) * 32767.0).astype(np.int16)
+    buf = memoryview(pcm16.reshape(-1)).cast("B")
+    stride = frames.shape[1] * 2
+    is_speech = vad.is_speech
+    for i in range(frames.shape[0]):
         try:
-            mask[i] = bool(vad.is_speech(pcm16.tobytes(), sr))
+            mask[i] = bool(is_speech(buf[i * stride:(i + 1) * stride], sr))
         except Exception:
             mask[i] = False
     return mask
 
 
-def _vad_energy_mask(frames: np.ndarray, energy_threshold: float) -> np.ndarray:
-    # RMS per frame
-    rms = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1) + 1e-12)
+# Median by selection rather than np.median's general path; even sizes average the two middle values
+def _median_fast(a: np.ndarray) -> float:
+    k = a.size // 2
+    if a.size % 2:
+        return float(np.partition(a, k)[k])
+    p = np.partition(a, (k - 1, k))
+    return float((p[k - 1] + p[k]) / 2)
+
+
+def _vad_energy_mask(rms: np.ndarray, energy_threshold: float, margin: float = 1.0) -> np.ndarray:
+    # Takes the per-frame RMS already computed with the other features
+    if rms.size == 0:
+        return np.zeros(0, dtype=bool)
     # Robust baseline using median and MAD
-    med = float(np.median(rms))
-    mad = float(np.median(np.abs(rms - med)))
+    med = _median_fast(rms)
+    mad = _median_fast(np.abs(rms - med))
     robust = med + 1.5 * mad
     thr = max(energy_threshold, robust)
-    return rms > thr
+    return rms > (thr * margin)
 
 
 def _rms(frames: np.ndarray) -> np.ndarray:
-    return np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1) + 1e-12)
+    # Frames are float32 already; copy=False keeps that a no-op
+    return np.sqrt(np.mean(np.square(frames.astype(np.float32, copy=False)), axis=1) + 1e-12)
 
 
 def _zcr(frames: np.ndarray) -> np.ndarray:
     if frames.size == 0:
         return np.zeros(0, dtype=np.float32)
-    signs = np.sign(frames)
-    # treat zeros as previous sign to avoid artificial crossings
-    signs[signs == 0] = 1
-    changes = (signs[:, 1:] * signs[:, :-1]) < 0
-    return changes.mean(axis=1).astype(np.float32)
+    # Compare sign bits as bools instead of multiplying float signs; zeros count as positive
+    neg = frames < 0
+    changes = np.count_nonzero(neg[:, 1:] != neg[:, :-1], axis=1)
+    return (changes / (frames.shape[1] - 1)).astype(np.float32)
 
 
-def _spectral_flatness(frames: np.ndarray) -> np.ndarray:
-    # Compute spectral flatness on magnitude spectrum
-    if frames.size == 0:
-        return np.zeros(0, dtype=np.float32)
-    # Apply small Hann window to reduce spectral leakage
-    N = frames.shape[1]
-    window = np.hanning(N).astype(np.float32)
-    X = np.abs(np.fft.rfft(frames * window, axis=1)) + 1e-12
-    geo = np.exp(np.mean(np.log(X), axis=1))
-    arith = np.mean(X, axis=1)
-    flatness = (geo / arith).astype(np.float32)
-    return flatness
+# Window and frequency axis depend only on the frame size, so build them once per (N, sr)
+# The cached arrays are shared and marked read-only
+@lru_cache(maxsize=8)
+def _hann(N: int) -> np.ndarray:
+    w = np.hanning(N).astype(np.float32)
+    w.setflags(write=False)
+    return w
 
 
-def _band_energy_ratio(frames: np.ndarray, sr: int, low_hz: int, high_hz: int) -> np.ndarray:
-    if frames.size == 0:
-        return np.zeros(0, dtype=np.float32)
-    N = frames.shape[1]
-    window = np.hanning(N).astype(np.float32)
-    X = np.abs(np.fft.rfft(frames * window, axis=1))
-    freqs = np.fft.rfftfreq(N, d=1.0 / sr)
-    lo = max(0, int(np.searchsorted(freqs, low_hz)))
-    hi = int(np.searchsorted(freqs, high_hz))
-    total = (X ** 2).sum(axis=1) + 1e-12
-    band = (X[:, lo:hi] ** 2).sum(axis=1)
-    return (band / total).astype(np.float32)
+@lru_cache(maxsize=8)
+def _rfftfreqs(N: int, sr: int) -> np.ndarray:
+    f = np.fft.rfftfreq(N, d=1.0 / sr)
+    f.setflags(write=False)
+    return f
 
 
-def _spectral_centroid(frames: np.ndarray, sr: int) -> np.ndarray:
-    if frames.size == 0:
-        return np.zeros(0, dtype=np.float32)
-    N = frames.shape[1]
-    window = np.hanning(N).astype(np.float32)
-    X = np.abs(np.fft.rfft(frames * window, axis=1)) + 1e-12
-    freqs = np.fft.rfftfreq(N, d=1.0 / sr).astype(np.float32)
-    num = (X * freqs).sum(axis=1)
-    den = X.sum(axis=1)
-    return (num / den).astype(np.float32)
+# Row-wise real FFT; scipy's pocketfft splits the rows across all cores
+def _rfft_rows(x: np.ndarray) -> np.ndarray:
+    if _sp_fft is not None:
+        return _sp_fft.rfft(x, axis=1, workers=-1)
+    return np.fft.rfft(x, axis=1)
 
 
-def _segments_from_mask(mask: np.ndarray, frame_ms: int) -> List[Tuple[int, int]]:
-    segs: List[Tuple[int, int]] = []
-    if mask.size == 0:
-        return segs
-    n = mask.size
-    i = 0
-    while i < n:
-        if not mask[i]:
-            i += 1
-            continue
-        start = i
-        while i < n and mask[i]:
-            i += 1
-        end = i  # exclusive
-        segs.append((start * frame_ms, end * frame_ms))
-    return segs
-
-
-def _merge_close(segs: List[Tuple[int, int]], min_silence_ms: int) -> List[Tuple[int, int]]:
-    if not segs:
-        return []
-    out: List[Tuple[int, int]] = []
-    cur_s, cur_e = segs[0]
-    for s, e in segs[1:]:
-        gap = s - cur_e
-        if gap <= min_silence_ms:
-            cur_e = max(cur_e, e)
-        else:
-            out.append((cur_s, cur_e))
-            cur_s, cur_e = s, e
-    out.append((cur_s, cur_e))
-    return out
+# Rough working-set budget per feature tile (windowed input + spectrum), sized for L2
+_FEATURE_TILE_BYTES = 1 << 20
 
 
-def _drop_short(segs: List[Tuple[int, int]], min_speech_ms: int) -> List[Tuple[int, int]]:
-    return [(s, e) for s, e in segs if (e - s) >= min_speech_ms]
-
-
-def _pad_and_clip(
-    segs: List[Tuple[int, int]], pad_ms: int, total_ms: int
-) -> List[Tuple[int, int]]:
-    if not segs:
-        return []
-    padded: List[Tuple[int, int]] = []
-    for s, e in segs:
-        s2 = max(0, s - pad_ms)
-        e2 = min(total_ms, e + pad_ms)
-        padded.append((s2, e2))
-    # merge overlaps after padding
-    padded.sort()
-    out: List[Tuple[int, int]] = []
-    cs, ce = padded[0]
-    for s, e in padded[1:]:
-        if s <= ce:
-            ce = max(ce, e)
+def _compute_features(frames: np.ndarray, sr: int, params: Params) -> Dict[str, np.ndarray]:
+    # Frame-wise gating features; the spectral ones share a single windowed rFFT
+    n = frames.shape[0]
+    feats = {k: np.empty(n, dtype=np.float32) for k in ("rms", "zcr", "flatness", "ber", "centroid")}
+    if n == 0:
+        return feats
+    N = frames.shape[1]
+    # Apply small Hann window to reduce spectral leakage
+    window = _hann(N)
+    freqs = _rfftfreqs(N, sr)
+    freqs32 = freqs.astype(np.float32)
+    # Speech-band bins as a 0/1 weight vector so the band sum is one matrix-vector product
+    band_mask = ((freqs >= params.band_low_hz) & (freqs < params.band_high_hz)).astype(np.float32)
+    # Work through the frames in cache-sized tiles instead of materializing the full spectrum
+    tile = max(64, _FEATURE_TILE_BYTES // (N * 4 + (N // 2 + 1) * 8))
+    for i0 in range(0, n, tile):
+        fr = frames[i0:i0 + tile]
+        out = slice(i0, i0 + fr.shape[0])
+        X = np.abs(_rfft_rows(fr * window))
+        Xe = X + 1e-12
+        # Spectral flatness on magnitude spectrum: geometric / arithmetic mean
+        feats["flatness"][out] = np.exp(np.mean(np.log(Xe), axis=1)) / np.mean(Xe, axis=1)
+        # Share of power inside the speech band
+        X2 = X ** 2
+        feats["ber"][out] = (X2 @ band_mask.astype(X2.dtype, copy=False)) / (X2.sum(axis=1) + 1e-12)
+        # Magnitude-weighted mean frequency
+        feats["centroid"][out] = (Xe * freqs32).sum(axis=1) / Xe.sum(axis=1)
+        feats["rms"][out] = _rms(fr)
+        feats["zcr"][out] = _zcr(fr)
+    return feats
+
+
+def _hysteresis_loop(pre_mask: np.ndarray, n_on: int, n_off: int) -> np.ndarray:
+    mask = np.zeros_like(pre_mask)
+    on_count = 0
+    off_count = 0
+    in_speech = False
+    for i in range(pre_mask.size):
+        if pre_mask[i]:
+            on_count += 1
+            off_count = 0
         else:
-            out.append((cs, ce))
-            cs, ce = s, e
-    out.append((cs, ce))
-    return out
+            off_count += 1
+            on_count = 0
+        if not in_speech and on_count >= n_on:
+            in_speech = True
+        if in_speech:
+            mask[i] = True
+            if off_count > n_off:
+                in_speech = False
+                on_count = 0
+                off_count = 0
+    return mask
+
+
+_hysteresis_nb = njit(cache=True)(_hysteresis_loop) if njit is not None else None
 
 
-def _complement_silence(segs: List[Tuple[int, int]], total_ms: int) -> List[Tuple[int, int]]:
-    out: List[Tuple[int, int]] = []
-    cur = 0
-    for s, e in segs:
-        if s > cur:
-            out.append((cur, s))
-        cur = e
-    if cur < total_ms:
-        out.append((cur, total_ms))
+def _apply_hysteresis(pre_mask: np.ndarray, n_on: int, n_off: int) -> np.ndarray:
+    if _hysteresis_nb is not None:
+        return _hysteresis_nb(np.ascontiguousarray(pre_mask, dtype=np.bool_), n_on, n_off)
+    return _hysteresis_loop(pre_mask, n_on, n_off)
+
+
+def _mask_to_segments(
+    mask: np.ndarray,
+    frame_ms: int,
+    min_silence_ms: int,
+    min_speech_ms: int,
+    pad_ms: int,
+    total_ms: int,
+) -> np.ndarray:
+    # Speech runs -> merge short gaps -> drop short runs -> pad/clip -> merge overlaps,
+    # all on (K, 2) int64 arrays of (start_ms, end_ms)
+    empty = np.empty((0, 2), dtype=np.int64)
+    if mask.size == 0:
+        return empty
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1).astype(np.int64) * frame_ms
+    ends = np.flatnonzero(edges == -1).astype(np.int64) * frame_ms
+    if starts.size == 0:
+        return empty
+    # Merge runs separated by at most min_silence_ms
+    opens = np.concatenate(([True], (starts[1:] - ends[:-1]) > min_silence_ms))
+    closes = np.concatenate((opens[1:], [True]))
+    starts = starts[opens]
+    ends = ends[closes]
+    # Drop segments shorter than min_speech_ms
+    keep = (ends - starts) >= min_speech_ms
+    if not keep.any():
+        return empty
+    # Pad and clip to the recording, then merge anything the padding made overlap
+    starts = np.maximum(0, starts[keep] - pad_ms)
+    ends = np.minimum(total_ms, ends[keep] + pad_ms)
+    order = np.lexsort((ends, starts))
+    starts = starts[order]
+    ends = ends[order]
+    running_end = np.maximum.accumulate(ends)
+    group = np.concatenate(([0], np.flatnonzero(starts[1:] > running_end[:-1]) + 1))
+    out = np.empty((group.size, 2), dtype=np.int64)
+    out[:, 0] = starts[group]
+    out[:, 1] = np.maximum.reduceat(ends, group)
     return out
 
 
+def _complement_silence(segs: np.ndarray, total_ms: int) -> np.ndarray:
+    # Gaps between sorted, non-overlapping (K, 2) segments, as a (K', 2) array
+    starts = np.concatenate(([0], segs[:, 1]))
+    ends = np.concatenate((segs[:, 0], [total_ms]))
+    sil = np.stack([starts, ends], axis=1).astype(np.int64, copy=False)
+    return sil[sil[:, 1] > sil[:, 0]]
+
+
 def _write_wav_mono_int16(path: Path, sr: int, chunks: Iterable[np.ndarray]) -> int:
-    total_samples = 0
+    parts = [arr for arr in chunks if arr.size]
+    # Quantize every chunk into one preallocated buffer and write it in a single call
+    out = np.empty(sum(arr.size for arr in parts), dtype=np.int16)
+    pos = 0
+    for arr in parts:
+        pcm = np.clip(arr, -1.0, 1.0)
+        pcm *= 32767.0
+        out[pos:pos + pcm.size] = pcm
+        pos += pcm.size
     with wave.open(str(path), "wb") as wf:
         wf.setnchannels(1)
         wf.setsampwidth(2)
         wf.setframerate(sr)
-        for arr in chunks:
-            if arr.size == 0:
-                continue
-            pcm = np.clip(arr, -1.0, 1.0)
-            pcm16 = (pcm * 32767.0).astype(np.int16)
-            wf.writeframes(pcm16.tobytes())
-            total_samples += pcm16.size
-    return total_samples
+        wf.writeframes(memoryview(out).cast("B"))
+    return int(out.size)
 
 
 def derive_outputs(input_wav: str) -> Tuple[str, str]:
@@ -304,7 +388,8 @@ def build_speech_only_with_silence_map(
 
     x, sr, ch_in = _read_wav_mono(in_path)
     # DC blocking / light high-pass to reduce low-frequency rumble
-    x = _dc_block(x)
+    # x is a fresh buffer owned here, so the filter may overwrite it
+    x = _dc_block(x, inplace=True)
     total_ms = int(round(len(x) * 1000.0 / sr))
 
     frames, frame_len = _frame_signal(x, sr, params.frame_ms)
@@ -317,83 +402,61 @@ def build_speech_only_with_silence_map(
     )
 
     n_frames = frames.shape[0]
-    # Frame-wise features for gating
-    rms = _rms(frames) if n_frames > 0 else np.zeros(0, dtype=np.float32)
-    zcr = _zcr(frames) if n_frames > 0 else np.zeros(0, dtype=np.float32)
-    flat = _spectral_flatness(frames) if n_frames > 0 else np.zeros(0, dtype=np.float32)
-    # Robust energy threshold
-    med = float(np.median(rms)) if rms.size else 0.0
-    mad = float(np.median(np.abs(rms - med))) if rms.size else 0.0
-    robust_thr = max(params.energy_threshold, med + 1.5 * mad)
 
     if use_webrtc and n_frames > 0:
         vad_mask = _vad_webrtc_mask(frames, sr, params.frame_ms, params.aggr)
     else:
         vad_mask = np.zeros(n_frames, dtype=bool)
 
-    energy_mask = rms > (robust_thr * 1.2)
-    zcr_mask = (zcr >= params.zcr_low) & (zcr <= params.zcr_high)
-    flat_mask = flat < params.flatness_max
-    ber = _band_energy_ratio(frames, sr, params.band_low_hz, params.band_high_hz)
-    ber_mask = ber >= params.band_energy_ratio_min
-    centroid = _spectral_centroid(frames, sr)
-    centroid_mask = (centroid >= params.centroid_low_hz) & (centroid <= params.centroid_high_hz)
-
-    if use_webrtc:
-        base = vad_mask
+    # Per-gate masks (energy, zcr, flat, ber, centroid); stays None when the features are skipped
+    gates: Optional[Tuple[np.ndarray, ...]] = None
+    if use_webrtc and not params.refine_with_features:
+        # WebRTC alone decides; the feature passes would only be computed to be ignored
+        pre_mask = vad_mask
     else:
-        base = energy_mask & zcr_mask & flat_mask & ber_mask & centroid_mask
+        # Frame-wise features for gating
+        feats = _compute_features(frames, sr, params)
+        zcr = feats["zcr"]
+        centroid = feats["centroid"]
+        # Robust energy threshold, with a 20% margin over the baseline
+        energy_mask = _vad_energy_mask(feats["rms"], params.energy_threshold, margin=1.2)
+        zcr_mask = (zcr >= params.zcr_low) & (zcr <= params.zcr_high)
+        flat_mask = feats["flatness"] < params.flatness_max
+        ber_mask = feats["ber"] >= params.band_energy_ratio_min
+        centroid_mask = (centroid >= params.centroid_low_hz) & (centroid <= params.centroid_high_hz)
+        gates = (energy_mask, zcr_mask, flat_mask, ber_mask, centroid_mask)
+
+        feature_mask = energy_mask & zcr_mask & flat_mask & ber_mask & centroid_mask
+        if use_webrtc:
+            base = vad_mask
+        else:
+            base = feature_mask
 
-    pre_mask = base & energy_mask & zcr_mask & flat_mask & ber_mask & centroid_mask
+        pre_mask = base & feature_mask
 
     # Apply hysteresis: require N consecutive ON to start, H hangover OFF to end
-    mask = np.zeros_like(pre_mask)
-    on_count = 0
-    off_count = 0
-    in_speech = False
-    for i, val in enumerate(pre_mask):
-        if val:
-            on_count += 1
-            off_count = 0
-        else:
-            off_count += 1
-            on_count = 0
-        if not in_speech and on_count >= params.require_consecutive_on:
-            in_speech = True
-        if in_speech:
-            mask[i] = True
-            if off_count > params.hangover_off:
-                in_speech = False
-                on_count = 0
-                off_count = 0
+    mask = _apply_hysteresis(pre_mask, params.require_consecutive_on, params.hangover_off)
 
-    # Diagnostics
+    # Diagnostics (gate counts are -1 when the feature gates were skipped)
     if n_frames > 0:
+        gate_counts = [int(g.sum()) for g in gates] if gates is not None else [-1] * 5
         logger.info(
             "Frames=%d webrtc=%s keep_webrtc=%d keep_energy=%d keep_zcr=%d keep_flat=%d keep_ber=%d keep_centroid=%d keep_all=%d",
             n_frames,
             use_webrtc,
             int(vad_mask.sum()) if use_webrtc else 0,
-            int(energy_mask.sum()),
-            int(zcr_mask.sum()),
-            int(flat_mask.sum()),
-            int(ber_mask.sum()),
-            int(centroid_mask.sum()),
+            *gate_counts,
             int(mask.sum()),
         )
 
-    segs = _segments_from_mask(mask, params.frame_ms)
-    segs = _merge_close(segs, params.min_silence_ms)
-    segs = _drop_short(segs, params.min_speech_ms)
-    segs = _pad_and_clip(segs, params.pad_ms, total_ms)
-
-    silences = _complement_silence(segs, total_ms)
+    segs_arr = _mask_to_segments(
+        mask, params.frame_ms, params.min_silence_ms, params.min_speech_ms, params.pad_ms, total_ms
+    )
+    silences_arr = _complement_silence(segs_arr, total_ms)
 
-    chunks: List[np.ndarray] = []
-    for s_ms, e_ms in segs:
-        s = int(s_ms * sr / 1000)
-        e = int(e_ms * sr / 1000)
-        chunks.append(x[s:e])
+    # Sample offsets for every kept segment in one integer pass (ms * sr is exact in int64)
+    bounds = segs_arr * sr // 1000
+    chunks = (x[s:e] for s, e in bounds.tolist())
 
     out_audio_path = Path(output_wav)
     out_map_path = Path(map_tsv)
@@ -406,13 +469,15 @@ def build_speech_only_with_silence_map(
     )
     _write_wav_mono_int16(out_audio_path, sr, chunks)
 
-    with open(out_map_path, "w", encoding="utf-8") as f:
-        f.write("start_ms\tend_ms\tdur_ms\n")
-        for s, e in silences:
-            f.write(f"{int(s)}\t{int(e)}\t{int(e - s)}\n")
+    # Readers (server.py) rely on the map being in ascending start order; the gaps
+    # between sorted segments already are
+    # Format every row up front and hand the file a single write
+    lines = ["start_ms\tend_ms\tdur_ms"]
+    lines.extend(f"{s}\t{e}\t{e - s}" for s, e in silences_arr.tolist())
+    out_map_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
 
-    speech_ms = sum(max(0, e - s) for s, e in segs)
-    removed_ms = sum(max(0, e - s) for s, e in silences)
+    speech_ms = int((segs_arr[:, 1] - segs_arr[:, 0]).sum())
+    removed_ms = int((silences_arr[:, 1] - silences_arr[:, 0]).sum())
 
     res = Result(
         input_path=str(in_path),
@@ -423,7 +488,7 @@ def build_speech_only_with_silence_map(
         duration_ms=total_ms,
         speech_ms=int(speech_ms),
         removed_ms=int(removed_ms),
-        segment_count=len(segs),
+        segment_count=int(segs_arr.shape[0]),
     )
     logger.info(
         "Speech-only created: %s | Map: %s | total=%.2fs speech=%.2fs removed=%.2fs segments=%d",
@@ -1,10 +1,10 @@
 import threading
-import queue
 import wave
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Deque, List, Optional, Callable, Union
 
 import numpy as np
 import logging
@@ -14,7 +14,6 @@ try:
 except Exception as e:
     sd = None
 
-from faster_whisper import WhisperModel
 from db import TranscriptionDB
 
 # Simple console logger
@@ -36,6 +35,8 @@ class TranscriberConfig:
     sample_rate: int = 16000
     channels: int = 1
     beam_size: int = 5
+    batch_size: int = 16
+    blocksize: int = 512
     sessions_dir: str = "sessions"
 
 
@@ -73,6 +74,15 @@ class SimpleTranscriber:
         self.on_complete = on_complete
 
         # Initialize Whisper model with CPU fallback
+        # faster_whisper (ctranslate2 + CUDA init) is imported here rather than at module
+        # load so importing this module stays cheap for callers that never record
+        from faster_whisper import WhisperModel
+        try:
+            from faster_whisper import BatchedInferencePipeline
+        except ImportError:  # faster-whisper < 1.1
+            BatchedInferencePipeline = None
+
+        self.pipeline = None
         try:
             self.model = WhisperModel(
                 self.cfg.model_size,
@@ -82,6 +92,14 @@ class SimpleTranscriber:
 
             logger.info(
                 f"cfg: {self.cfg}")
+
+            # Batched decoding keeps the GPU busy with several 30 s windows per forward pass
+            if (
+                BatchedInferencePipeline is not None
+                and self.cfg.batch_size > 1
+                and self.cfg.device != "cpu"
+            ):
+                self.pipeline = BatchedInferencePipeline(model=self.model)
         except Exception:
             if self.cfg.device != "cpu":
                 # Fallback to CPU if GPU not available
@@ -99,7 +117,14 @@ class SimpleTranscriber:
         self.session_id: Optional[int] = None
 
         # Runtime state for audio recording
-        self._audio_q: "queue.Queue[np.ndarray]" = queue.Queue(maxsize=256)
+        # PCM blocks handed from the audio callback to the recording thread
+        self._buf: Deque[bytes] = deque()
+        self._buf_cv = threading.Condition()
+        self._buf_max = 256
+        # Everything written to the WAV this session, kept so transcription can skip re-reading it.
+        # Only collected when the capture format is already what Whisper wants (decided in start())
+        self._keep_pcm = False
+        self._pcm_chunks: List[bytes] = []
         self._stop_event = threading.Event()
         self._paused_event = threading.Event()
         self._record_thread: Optional[threading.Thread] = None
@@ -107,6 +132,10 @@ class SimpleTranscriber:
         self._wav: Optional[wave.Wave_write] = None
         self._wav_path: Optional[Path] = None
         self._total_frames = 0
+        self._dropped_blocks = 0
+        # Preallocated per-block buffers reused by the audio callback
+        self._clip_buf = np.empty((self.cfg.blocksize, self.cfg.channels), dtype=np.float32)
+        self._pcm_buf = np.empty((self.cfg.blocksize, self.cfg.channels), dtype=np.int16)
 
     def start(self, title: Optional[str] = None) -> int:
         """
@@ -150,6 +179,10 @@ class SimpleTranscriber:
         self._wav.setsampwidth(2)  # 16-bit PCM
         self._wav.setframerate(self.cfg.sample_rate)
         self._total_frames = 0
+        self._dropped_blocks = 0
+        self._buf.clear()
+        self._pcm_chunks = []
+        self._keep_pcm = self.cfg.sample_rate == 16000 and self.cfg.channels == 1
 
         # Start microphone audio stream
         self._stop_event.clear()
@@ -159,11 +192,11 @@ class SimpleTranscriber:
             channels=self.cfg.channels,
             dtype="float32",
             callback=self._audio_callback,
-            blocksize=512,
+            blocksize=self.cfg.blocksize,
         )
         self._stream.start()
 
-        # Start recording thread (just writes to WAV, no transcription yet)
+        # Start recording thread (drains audio blocks into the WAV, no transcription yet)
         self._record_thread = threading.Thread(target=self._run_recording, daemon=True)
         self._record_thread.start()
         
@@ -200,17 +233,24 @@ class SimpleTranscriber:
         finally:
             self._stream = None
 
-        # Signal recording thread to stop
-        try:
-            self._audio_q.put_nowait(None)  # type: ignore[arg-type]
-        except Exception:
-            pass
+        # Wake the recording thread so it drains what is left and exits
+        with self._buf_cv:
+            self._buf_cv.notify()
 
         # Wait for recording thread to finish
         if self._record_thread:
             self._record_thread.join(timeout=10)
             self._record_thread = None
 
+        # Flush any block a late callback queued after the thread's final drain
+        with self._buf_cv:
+            leftover = b"".join(self._buf)
+            self._buf.clear()
+        if leftover and self._wav:
+            self._wav.writeframes(leftover)
+            if self._keep_pcm:
+                self._pcm_chunks.append(leftover)
+
         # Close WAV file
         if self._wav:
             try:
@@ -220,16 +260,26 @@ class SimpleTranscriber:
             self._wav = None
 
         logger.info("Stopped recording (session %s). Total frames: %d", self.session_id, self._total_frames)
+        if self._dropped_blocks:
+            logger.warning("Dropped %d audio blocks because the WAV writer fell behind", self._dropped_blocks)
 
-        # Now transcribe the complete audio file
+        # Transcribe the complete audio file (outside any DB transaction; this can take minutes)
+        full_text: Optional[str] = None
         if self._wav_path and self._wav_path.exists() and self.session_id is not None:
-            self._transcribe_and_save()
-        
-        # Update session status
+            full_text = self._transcribe()
+
+        # Store the transcript and the session status in one commit
         if self.session_id is not None:
-            self.db.end_session(self.session_id, status="completed")
+            full_text = self._save_and_end_session(full_text)
             self.session_id = None
 
+        # Call completion callback once the transcript is committed
+        if full_text is not None and self.on_complete:
+            try:
+                self.on_complete(full_text, str(self._wav_path))
+            except Exception:
+                pass
+
     def pause(self) -> None:
         """Pause audio recording without ending the session."""
         self._paused_event.set()
@@ -244,8 +294,8 @@ class SimpleTranscriber:
         """
         Callback invoked by sounddevice when audio data is available.
         
-        This runs on a separate audio thread and just writes audio to the WAV file.
-        No transcription happens here.
+        This runs on PortAudio's real-time thread, so it only converts the block
+        and hands it to the recording thread; no file I/O or transcription here.
         """
         if status:
             # Audio dropouts or overflows - log but continue
@@ -255,24 +305,46 @@ class SimpleTranscriber:
         if self._stop_event.is_set() or self._paused_event.is_set():
             return
 
-        # Write audio to WAV file as 16-bit PCM
+        # Queue audio for the WAV file as 16-bit PCM
         if self._wav is not None and not self._paused_event.is_set():
-            # Clip to valid range and convert to 16-bit integers
-            pcm16 = np.clip(indata, -1.0, 1.0)
-            pcm16 = (pcm16 * 32767.0).astype(np.int16)
-            self._wav.writeframes(pcm16.tobytes())
+            if frames > self._pcm_buf.shape[0]:
+                self._clip_buf = np.empty((frames, self.cfg.channels), dtype=np.float32)
+                self._pcm_buf = np.empty((frames, self.cfg.channels), dtype=np.int16)
+            # Clip to valid range and convert to 16-bit integers without allocating
+            clipped = np.clip(indata, -1.0, 1.0, out=self._clip_buf[:frames])
+            pcm16 = np.multiply(clipped, 32767.0, out=self._pcm_buf[:frames], casting="unsafe")
+            data = pcm16.tobytes()
+            with self._buf_cv:
+                if len(self._buf) >= self._buf_max:
+                    # Never block the audio thread; drop the block instead
+                    self._dropped_blocks += 1
+                    return
+                self._buf.append(data)
+                self._buf_cv.notify()
             self._total_frames += frames
 
     def _run_recording(self) -> None:
         """
         Recording thread main loop.
         
-        This just keeps the thread alive while recording.
-        The actual audio writing happens in the callback.
+        Drains blocks queued by the audio callback and writes them to the WAV
+        file, joining everything that accumulated since the last wakeup into a
+        single write. Exits once stop() has been requested and the buffer is empty.
         """
         try:
-            while not self._stop_event.is_set():
-                self._stop_event.wait(timeout=0.5)
+            while True:
+                with self._buf_cv:
+                    while not self._buf and not self._stop_event.is_set():
+                        self._buf_cv.wait(timeout=0.5)
+                    chunks = list(self._buf)
+                    self._buf.clear()
+                if not chunks:
+                    break
+                if self._wav is not None:
+                    data = b"".join(chunks)
+                    self._wav.writeframes(data)
+                    if self._keep_pcm:
+                        self._pcm_chunks.append(data)
         except Exception as e:
             logger.exception("Recording error: %s", e)
             if self.on_error:
@@ -281,23 +353,59 @@ class SimpleTranscriber:
                 except Exception:
                     pass
 
-    def _transcribe_and_save(self) -> None:
+    def _recorded_audio(self) -> Union[np.ndarray, str]:
+        """
+        Return the session audio for Whisper.
+
+        When the capture format is what Whisper expects (16 kHz mono), the PCM
+        kept in memory during recording is converted to float32 directly;
+        otherwise the WAV path is returned and faster-whisper decodes and
+        resamples the file itself.
         """
-        Transcribe the complete recorded audio file and save to database.
+        chunks, self._pcm_chunks = self._pcm_chunks, []
+        if not self._keep_pcm or not chunks:
+            return str(self._wav_path)
+        # Convert chunk by chunk into one preallocated array, releasing each chunk as it
+        # is copied, so peak memory stays near the float32 result plus the PCM itself
+        audio = np.empty(sum(len(c) for c in chunks) // 2, dtype=np.float32)
+        pos = 0
+        for i, chunk in enumerate(chunks):
+            pcm = np.frombuffer(chunk, dtype=np.int16)
+            audio[pos:pos + pcm.size] = pcm
+            pos += pcm.size
+            chunks[i] = b""
+        audio *= 1.0 / 32768.0  # Same scaling faster-whisper's decoder applies to s16 input
+        return audio
+
+    def _transcribe(self) -> Optional[str]:
+        """
+        Transcribe the complete recorded audio file.
         
-        This is called after stop() closes the WAV file.
+        This is called after stop() closes the WAV file and touches no
+        database state. Returns the formatted transcript, or None if nothing
+        was transcribed.
         """
         try:
             wav_path_str = str(self._wav_path)
             logger.info("Starting transcription of %s", wav_path_str)
+            audio = self._recorded_audio()
             
-            # Transcribe the entire audio file at once
-            segments, info = self.model.transcribe(
-                audio=wav_path_str,
-                beam_size=self.cfg.beam_size,
-                language=self.cfg.language,
-                word_timestamps=False,
-            )
+            # Transcribe the entire recording at once
+            if self.pipeline is not None:
+                segments, info = self.pipeline.transcribe(
+                    audio=audio,
+                    batch_size=self.cfg.batch_size,
+                    beam_size=self.cfg.beam_size,
+                    language=self.cfg.language,
+                    word_timestamps=False,
+                )
+            else:
+                segments, info = self.model.transcribe(
+                    audio=audio,
+                    beam_size=self.cfg.beam_size,
+                    language=self.cfg.language,
+                    word_timestamps=False,
+                )
             
             # logger.info(
             #     "Detected language '%s' with probability %.2f",
@@ -306,44 +414,54 @@ class SimpleTranscriber:
             # )
             
             # Collect all segments into formatted transcript
-            transcript_lines = []
-            for seg in segments:
-                text = (seg.text or "").strip()
-                if not text:
-                    continue
-                
-                # Format: [start -> end] text
-                line = f"[{seg.start:.2f}s -> {seg.end:.2f}s]  {text}"
-                transcript_lines.append(line)
-                # logger.info(line)
-            
-            # Save complete transcript to database
-            if transcript_lines and self._wav_path is not None:
-                full_text = "\n".join(transcript_lines)
-                self.db.insert_transcription(
-                    name=str(self._wav_path),
-                    model_size=self.cfg.model_size,
-                    transcription=full_text,
-                )
+            # Format: [start -> end] text
+            transcript_lines = [
+                f"[{seg.start:.2f}s -> {seg.end:.2f}s]  {text}"
+                for seg in segments
+                if (text := (seg.text or "").strip())
+            ]
+            if transcript_lines:
                 logger.info(
-                    "Session %s transcript saved (%d segments).",
+                    "Session %s transcribed (%d segments).",
                     self.session_id,
                     len(transcript_lines),
                 )
-                
-                # Call completion callback if provided
-                if self.on_complete:
-                    try:
-                        self.on_complete(full_text, wav_path_str)
-                    except Exception:
-                        pass
-            else:
-                logger.warning("No transcription generated for session %s", self.session_id)
+                return "\n".join(transcript_lines)
+            logger.warning("No transcription generated for session %s", self.session_id)
                 
         except Exception as e:
-            logger.exception("Transcription failed: %s", e)
-            if self.on_error:
-                try:
-                    self.on_error(e)
-                except Exception:
-                    pass
+            self._report_error("Transcription failed", e)
+        return None
+
+    def _save_and_end_session(self, full_text: Optional[str]) -> Optional[str]:
+        """
+        Save the transcript (if any) and mark the session completed.
+        
+        Both writes share one transaction, so they cost a single commit.
+        Returns the transcript if it was saved, otherwise None.
+        """
+        try:
+            with self.db.transaction():
+                if full_text is not None and self._wav_path is not None:
+                    self.db.insert_transcription(
+                        name=str(self._wav_path),
+                        model_size=self.cfg.model_size,
+                        transcription=full_text,
+                    )
+                self.db.end_session(self.session_id, status="completed")
+            if full_text is not None:
+                logger.info("Session %s transcript saved.", self.session_id)
+            return full_text
+        except Exception as e:
+            self._report_error("Saving transcript failed", e)
+        # The transcript could not be stored; still close out the session
+        self.db.end_session(self.session_id, status="completed")
+        return None
+
+    def _report_error(self, message: str, exc: Exception) -> None:
+        logger.exception("%s: %s", message, exc)
+        if self.on_error:
+            try:
+                self.on_error(exc)
+            except Exception:
+                pass
@@ -8,11 +8,17 @@ information without invoking ffmpeg muxing.
 import argparse
 import json
 import os
+import sqlite3
 import sys
-from datetime import timedelta
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+try:
+    import orjson  # optional dependency
+except ImportError:
+    orjson = None
+
 # Allow imports from project root (where merge_media_db.py lives)
 SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPT_DIR.parent.parent
@@ -26,10 +32,13 @@ try:
         load_audio_metadata,
         load_frames_from_db,
         ffprobe_duration,
+        wav_header_duration,
     )
 except ImportError as exc:  # pragma: no cover - hard failure
     raise RuntimeError("Failed to import merge_media_db helpers") from exc
 
+FFPROBE_CACHE_PATH = Path.home() / ".cache" / "framer" / "ffprobe_cache.sqlite3"
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -57,6 +66,76 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def emit_json(obj: Any) -> None:
+    # frame_entries can run to tens of thousands of dicts; orjson is much faster there
+    # and formats datetimes natively (same text as isoformat()) without a Python call each.
+    # Its bytes go straight to stdout, skipping a decode/re-encode of the whole payload.
+    if orjson is not None:
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE))
+        sys.stdout.buffer.flush()
+        return
+    print(json.dumps(obj, default=_json_default), flush=True)
+
+
+def open_probe_cache() -> Optional[sqlite3.Connection]:
+    try:
+        FFPROBE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(FFPROBE_CACHE_PATH), timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS durations (
+                path TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                duration REAL NOT NULL,
+                PRIMARY KEY (path, mtime_ns, size)
+            ) WITHOUT ROWID
+            """
+        )
+        return conn
+    except (OSError, sqlite3.Error):
+        # The cache is best-effort; a read-only home just means probing every time
+        return None
+
+
+def ffprobe_duration_cached(exe: str, media: Path) -> float:
+    # WAV headers are cheaper to read than the cache; everything else is keyed on (path, mtime, size)
+    duration = wav_header_duration(media)
+    if duration is not None:
+        return duration
+    st = media.stat()
+    key = (str(media), st.st_mtime_ns, st.st_size)
+    conn = open_probe_cache()
+    if conn is None:
+        return ffprobe_duration(exe, media)
+    try:
+        row = conn.execute(
+            "SELECT duration FROM durations WHERE path = ? AND mtime_ns = ? AND size = ?",
+            key,
+        ).fetchone()
+        if row is not None:
+            return float(row[0])
+        duration = ffprobe_duration(exe, media)
+        try:
+            with conn:
+                conn.execute("DELETE FROM durations WHERE path = ?", (key[0],))
+                conn.execute("INSERT INTO durations VALUES (?, ?, ?, ?)", (*key, duration))
+        except sqlite3.Error:
+            pass
+        return duration
+    finally:
+        conn.close()
+
+
 def ensure_exists(path: Path, label: str) -> Path:
     if not path.exists():
         raise SystemExit(f"{label} not found: {path}")
@@ -90,10 +169,11 @@ def build_response(
     timeline_end = max(last_ts, audio_meta.end)
     offset_seconds = (first_ts - audio_meta.start).total_seconds()
 
+    # Frame timestamps stay datetimes here; emit_json renders them as ISO strings.
     frame_entries = [
         {
             "offset_index": stamp.offset_index,
-            "timestamp": stamp.timestamp.isoformat(),
+            "timestamp": stamp.timestamp,
             "seconds_from_video_start": (stamp.timestamp - first_ts).total_seconds(),
         }
         for stamp in frame_stamps
@@ -141,10 +221,10 @@ def main() -> int:
     if audio_meta is None or audio_meta.start is None or audio_meta.end is None:
         probe_exe = args.ffprobe or os.environ.get("FFPROBE")
         if probe_exe:
-            fallback_duration = ffprobe_duration(probe_exe, audio_path)
+            fallback_duration = ffprobe_duration_cached(probe_exe, audio_path)
         else:
             try:
-                fallback_duration = ffprobe_duration("ffprobe", audio_path)
+                fallback_duration = ffprobe_duration_cached("ffprobe", audio_path)
             except SystemExit:
                 fallback_duration = None
 
@@ -155,7 +235,7 @@ def main() -> int:
         audio_meta = AudioMeta(session_id=None, start=None, end=None)  # type: ignore[arg-type]
 
     payload = build_response(video_path, audio_path, frame_stamps, audio_meta, fallback_duration)
-    print(json.dumps(payload))
+    emit_json(payload)
     return 0
 
 
@@ -57,20 +57,18 @@ def canonicalize_path(value: Path | str) -> str:
 
 
 def fetch_video_row(conn: sqlite3.Connection, video_path: Path) -> Tuple[int, str]:
-    candidates = normalize_candidates(video_path.resolve())
-    row = None
-    for cand in candidates:
-        row = conn.execute(
-            "SELECT id, file_path FROM video_chunks WHERE file_path = ?",
-            (cand,),
-        ).fetchone()
-        if row:
-            break
-    if row is None:
-        row = conn.execute(
-            "SELECT id, file_path FROM video_chunks WHERE file_path LIKE ? ORDER BY id DESC LIMIT 1",
-            (f"%{video_path.name}",),
-        ).fetchone()
+    candidates = sorted(normalize_candidates(video_path.resolve()))
+    marks = ",".join("?" * len(candidates))
+    # One statement: an exact path variant wins, otherwise the newest row whose path ends in the file name
+    row = conn.execute(
+        f"""
+        SELECT id, file_path FROM video_chunks
+        WHERE file_path IN ({marks}) OR file_path LIKE ?
+        ORDER BY file_path IN ({marks}) DESC, id DESC
+        LIMIT 1
+        """,
+        (*candidates, f"%{video_path.name}", *candidates),
+    ).fetchone()
     if row is None:
         raise SystemExit(f"No video record found for {video_path}")
     return int(row["id"]), str(row["file_path"])
@@ -130,8 +130,12 @@ def main() -> int:
     cached_row: sqlite3.Row | None = None
     try:
         db_path = Path(args.db_path)
-        db_conn = sqlite3.connect(str(db_path))
+        db_conn = sqlite3.connect(str(db_path), timeout=5)
         db_conn.row_factory = sqlite3.Row
+        # Shared with the recorder and web server: WAL so this cache write never blocks their readers
+        db_conn.execute("PRAGMA journal_mode = WAL;")
+        db_conn.execute("PRAGMA synchronous = NORMAL;")
+        db_conn.execute("PRAGMA temp_store = MEMORY;")
         ensure_cache_table(db_conn)
         canonical = canonicalize_path(audio_path)
         cached_row = db_conn.execute(
@@ -6,8 +6,29 @@
 import argparse  # For parsing command-line arguments
 import json  # For outputting JSON responses
 import sqlite3  # For querying SQLite databases
-from typing import Any, Dict, List, Optional  # Type hints for better code documentation
-from datetime import datetime  # For timestamp parsing and calculations
+import sys  # For writing raw JSON bytes to stdout
+from typing import Any, Dict, List, Optional, Tuple  # Type hints for better code documentation
+from bisect import bisect_left  # For nearest-frame lookups in a sorted time window
+from datetime import datetime, timezone  # For timestamp parsing and calculations
+
+try:
+    import orjson  # Optional faster JSON serializer
+except ImportError:
+    orjson = None  # Fall back to the stdlib json module
+
+
+# Writes a response payload to stdout as one line of JSON
+# Uses orjson when installed since search results can hold thousands of hits;
+# its bytes are written directly, skipping the str decode and re-encode
+# Args:
+#   obj: Any - JSON-serializable payload
+def emit_json(obj: Any) -> None:
+    if orjson is not None:
+        sys.stdout.flush()  # Keep ordering with anything already printed
+        sys.stdout.buffer.write(orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE))  # orjson returns bytes
+        sys.stdout.buffer.flush()
+        return
+    print(json.dumps(obj), flush=True)
 
 
 # Opens a SQLite database connection with optimizations for concurrent reading
@@ -26,9 +47,10 @@ def open_db(path: str) -> sqlite3.Connection:
     except Exception:
         pass  # Ignore if already in WAL mode or not supported
     
-    conn.execute("PRAGMA busy_timeout = 2000;")  # Wait up to 2 seconds if database is locked
-    conn.execute("PRAGMA cache_size = -2000;")  # Use 2MB cache for better query performance
+    conn.execute("PRAGMA busy_timeout = 5000;")  # Wait up to 5 seconds if database is locked
+    conn.execute("PRAGMA cache_size = -65536;")  # 64MB page cache for FTS and frame scans
     conn.execute("PRAGMA temp_store = MEMORY;")  # Store temp tables in memory instead of disk
+    conn.execute("PRAGMA mmap_size = 268435456;")  # Memory-map up to 256MB of the file for reads
     return conn
 
 
@@ -47,6 +69,36 @@ def table_exists(conn: sqlite3.Connection, name: str) -> bool:
     return row is not None  # If row found, table exists
 
 
+# Builds an FTS5 MATCH expression from free-form user text
+# Each whitespace-separated term becomes a quoted string, so punctuation such as
+# "C++", "-" or ":" is matched literally instead of being parsed as FTS syntax
+# Terms are still ANDed together, same as an unquoted MATCH
+# Args:
+#   q: str - Raw search text from the UI
+# Returns:
+#   str - Safe MATCH expression (e.g., 'error "C++"' -> '"error" "C++"')
+def fts_query(q: str) -> str:
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+
+# Merges the [t - radius, t + radius] windows around each epoch into disjoint sorted ranges
+# Frame timestamps are stored in UTC (Screenpipe and mkv_ingest both write UTC), which the
+# text bounds built from these ranges rely on
+# Args:
+#   epochs: List[float] - Epoch seconds of the audio items
+#   radius: float - Half-width of each window in seconds
+# Returns:
+#   List of (start, end) epoch pairs, ascending and non-overlapping
+def frame_windows(epochs: List[float], radius: float) -> List[Tuple[float, float]]:
+    merged: List[List[float]] = []
+    for e in sorted(epochs):
+        if merged and e - radius <= merged[-1][1]:
+            merged[-1][1] = e + radius  # Overlaps the previous window; extend it
+        else:
+            merged.append([e - radius, e + radius])
+    return [(lo, hi) for lo, hi in merged]
+
+
 # Searches OCR frames and audio transcriptions across databases
 # Returns combined results with optional mapping of audio to nearest video frames
 # Supports full-text search via FTS indexes when available
@@ -60,6 +112,7 @@ def table_exists(conn: sqlite3.Connection, name: str) -> bool:
 #   screenpipe_db: Optional[str] - Path to OCR/frames database (or None)
 #   audio_db: Optional[str] - Path to audio transcriptions database (or None)
 #   map_audio_to_frames: bool - Whether to link audio results to nearest video frames
+#   order: str - "recent" (newest first) or "relevance" (FTS5 bm25 rank, needs q + FTS index)
 # Returns:
 #   Dict with structure: {"data": {"ocr": [...], "audio": [...]}}
 def search(
@@ -72,6 +125,7 @@ def search(
     screenpipe_db: Optional[str],
     audio_db: Optional[str],
     map_audio_to_frames: bool,
+    order: str = "recent",
 ) -> Dict[str, Any]:
     result: Dict[str, Any] = {"data": {"ocr": [], "audio": []}}  # Initialize empty result structure
 
@@ -83,13 +137,16 @@ def search(
             params: List[Any] = []  # Parameters for SQL query (prevents SQL injection)
             where_parts: List[str] = ["1=1"]  # Start with always-true condition to simplify AND logic
             join = ""  # Additional JOIN clauses (for FTS)
+            order_by = "frames.timestamp DESC"  # Newest frames first by default
             
             # Build query based on search text
             if q:  # If search query provided
                 if use_fts:  # Use full-text search for faster matching
                     join += " JOIN ocr_text_fts ON ocr_text.frame_id = ocr_text_fts.frame_id "
                     where_parts.append("ocr_text_fts MATCH ?")  # FTS MATCH syntax
-                    params.append(q)  # Add query as parameter
+                    params.append(fts_query(q))  # Quoted terms so user punctuation can't break the MATCH
+                    if order == "relevance":
+                        order_by = "MIN(ocr_text_fts.rank), frames.timestamp DESC"  # Best bm25 match per frame
                 else:  # Fallback to LIKE for substring matching
                     where_parts.append("ocr_text.text LIKE ?")
                     params.append(f"%{q}%")  # Wrap with % for substring search
@@ -122,7 +179,7 @@ def search(
                 {join}
                 WHERE {' AND '.join(where_parts)}
                 GROUP BY frames.id
-                ORDER BY frames.timestamp DESC
+                ORDER BY {order_by}
                 LIMIT ? OFFSET ?
             '''
             params2 = list(params)  # Copy params list
@@ -140,13 +197,16 @@ def search(
             params: List[Any] = []  # SQL parameters list
             where_parts: List[str] = ["1=1"]  # Start with always-true condition
             join = ""  # Additional JOIN clauses
+            order_by = "created_at DESC"  # Newest transcriptions first by default
             
             # Build query based on search text
             if q:  # If search query provided
                 if use_fts:  # Use full-text search if available
                     join = " JOIN audio_transcriptions_fts fts ON fts.rowid = audio_transcriptions.id "
-                    where_parts.append("fts MATCH ?")  # FTS MATCH syntax
-                    params.append(q)  # Search query
+                    where_parts.append("fts.audio_transcriptions_fts MATCH ?")  # FTS MATCH on the aliased table
+                    params.append(fts_query(q))  # Quoted terms, same as the OCR search
+                    if order == "relevance":
+                        order_by = "fts.rank, created_at DESC"  # bm25 rank (lower is better)
                 else:  # Fallback to LIKE for substring matching
                     where_parts.append("audio_transcriptions.transcription LIKE ?")
                     params.append(f"%{q}%")  # Wrap with % for substring search
@@ -158,11 +218,11 @@ def search(
 
             # Build SQL query for audio transcriptions
             sql = f'''
-                SELECT id, name, model_size, transcription, created_at
+                SELECT audio_transcriptions.id, name, model_size, audio_transcriptions.transcription, created_at
                 FROM audio_transcriptions
                 {join}
                 WHERE {' AND '.join(where_parts)}
-                ORDER BY created_at DESC
+                ORDER BY {order_by}
                 LIMIT ? OFFSET ?
             '''
             params2 = list(params) + [limit, offset]  # Combine params with pagination
@@ -181,26 +241,59 @@ def search(
         # Optionally map audio transcriptions to nearest video frames
         # This allows showing a video frame alongside audio transcriptions in the UI
         if map_audio_to_frames and screenpipe_db and audio_items:
+            # Epoch seconds per audio item (naive timestamps read as UTC, like SQLite's julianday)
+            item_epochs: List[Optional[float]] = []
+            for item in audio_items:
+                ts = parse_ts(item["timestamp"]) if item.get("timestamp") else None
+                if ts is not None and ts.tzinfo is None:
+                    ts = ts.replace(tzinfo=timezone.utc)
+                item_epochs.append(ts.timestamp() if ts is not None else None)
+            known = [e for e in item_epochs if e is not None]
+
             oc = open_db(screenpipe_db)  # Reopen OCR database for frame queries
             try:
-                # Query to find frame closest in time to a given timestamp
-                # Uses julianday() to calculate absolute time difference in seconds
-                nearest_sql = (
-                    """
-                    SELECT f.id as frame_id, f.timestamp as frame_timestamp, f.offset_index, vc.file_path
-                    FROM frames f
-                    JOIN video_chunks vc ON f.video_chunk_id = vc.id
-                    ORDER BY ABS((julianday(f.timestamp) - julianday(?))*86400.0) ASC
-                    LIMIT 1
+                # Only frames within 5 seconds of some audio item can be associated, so fetch just
+                # the merged +/-5 s windows around the items, sorted by time, in one query
+                frame_rows: List[sqlite3.Row] = []
+                windows = frame_windows(known, 5.0)
+                if windows:
+                    ranges: List[str] = []
+                    range_params: List[Any] = []
+                    for lo, hi in windows:
+                        # Text bounds let SQLite range-scan idx_frames_timestamp; both ISO separators
+                        # ('T' and ' ') are covered, and the epoch test keeps the window exact
+                        lo_dt = datetime.fromtimestamp(int(lo // 1), tz=timezone.utc)
+                        hi_dt = datetime.fromtimestamp(int(hi // 1) + 1, tz=timezone.utc)
+                        for sep in ("T", " "):
+                            ranges.append(
+                                "(f.timestamp BETWEEN ? AND ?"
+                                " AND (julianday(f.timestamp) - 2440587.5) * 86400.0 BETWEEN ? AND ?)"
+                            )
+                            range_params += [
+                                lo_dt.strftime(f"%Y-%m-%d{sep}%H:%M:%S"),
+                                hi_dt.strftime(f"%Y-%m-%d{sep}%H:%M:%S"),
+                                lo,
+                                hi,
+                            ]
+                    window_sql = f"""
+                        SELECT f.id as frame_id, f.timestamp as frame_timestamp, f.offset_index, vc.file_path,
+                               (julianday(f.timestamp) - 2440587.5) * 86400.0 AS epoch
+                        FROM frames f
+                        JOIN video_chunks vc ON f.video_chunk_id = vc.id
+                        WHERE {' OR '.join(ranges)}
+                        ORDER BY epoch ASC
                     """
-                )
-                # For each audio item, find the nearest video frame
-                for item in audio_items:
+                    frame_rows = oc.execute(window_sql, range_params).fetchall()
+                frame_epochs = [r["epoch"] for r in frame_rows]
+
+                # For each audio item, pick the nearest frame from the sorted window
+                for item, item_epoch in zip(audio_items, item_epochs):
+                    if item_epoch is None or not frame_rows:
+                        continue
+                    i = bisect_left(frame_epochs, item_epoch)
+                    candidates = frame_rows[max(0, i - 1):i + 1]
+                    m = min(candidates, key=lambda r: abs(r["epoch"] - item_epoch))
                     try:
-                        m = oc.execute(nearest_sql, (item["timestamp"],)).fetchone()  # Query nearest frame
-                        if m is None:  # No frames found
-                            continue
-                        
                         # Calculate time difference between audio and frame timestamps
                         diff = abs(
                             (
@@ -352,6 +445,7 @@ def main() -> None:
     s.add_argument("--screenpipe_db", default="")  # Path to OCR database
     s.add_argument("--audio_db", default="")  # Path to audio database
     s.add_argument("--map_audio_to_frames", default="1")  # Link audio to nearest frames (1=yes, 0=no)
+    s.add_argument("--order", choices=("recent", "relevance"), default="recent")  # Result ordering for text queries
 
     # Define "neighbor" command and its arguments
     n = sub.add_parser("neighbor")  # Find adjacent frame
@@ -384,8 +478,9 @@ def main() -> None:
             screenpipe_db=args.screenpipe_db or None,  # OCR database path (or None)
             audio_db=args.audio_db or None,  # Audio database path (or None)
             map_audio_to_frames=(args.map_audio_to_frames not in ("0", "false", "False", "no", "")),  # Convert to bool
+            order=args.order,  # "recent" or "relevance"
         )
-        print(json.dumps(res))  # Output JSON to stdout
+        emit_json(res)  # Output JSON to stdout
         
     elif args.cmd == "neighbor":
         # Execute neighbor command to find adjacent frame
@@ -395,7 +490,7 @@ def main() -> None:
             offset_index=args.offset_index,  # Current offset
             direction=args.dir,  # "prev" or "next"
         )
-        print(json.dumps(res))  # Output JSON to stdout
+        emit_json(res)  # Output JSON to stdout
         
     elif args.cmd == "offset":
         # Execute offset command to calculate frame position
@@ -404,7 +499,7 @@ def main() -> None:
             file_path=args.file_path,  # Video file
             frame_timestamp=args.timestamp,  # Target timestamp
         )
-        print(json.dumps(res))  # Output JSON to stdout
+        emit_json(res)  # Output JSON to stdout
 
 
 # Entry point when script is executed directly